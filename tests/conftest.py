@@ -1,7 +1,6 @@
 """Shared pytest fixtures for notebook SQL tests."""
 
 import os
-import re
 import shutil
 import tempfile
 
@@ -9,27 +8,20 @@ import pytest
 from delta import configure_spark_with_delta_pip
 from pyspark.sql import SparkSession
 
-from tests.notebook_utils import get_all_sql_cells, strip_identity
-
-# Paths to DDL notebooks (relative to repo root)
-_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-_BRONZE_DDL = os.path.join(_REPO_ROOT, "labs", "week4", "create_bronze.ipynb")
-_SILVER_DDL = os.path.join(_REPO_ROOT, "labs", "week5", "create_silver.ipynb")
-_GOLD_DDL = os.path.join(_REPO_ROOT, "labs", "week6", "create_gold.ipynb")
-
-
-def _is_only_comments(sql):
-    """Return True if the SQL contains no executable statements (only comments/whitespace)."""
-    for line in sql.splitlines():
-        stripped = line.strip()
-        if stripped and not stripped.startswith("--"):
-            return False
-    return True
+from tests.layer_snapshots import LayerSnapshots
+from tests.resource_profile import apply_profile, parse_size, plan_profile
+from tests.sql_cells import prepare_ddl
 
 
 @pytest.fixture(scope="session")
 def spark_session(tmp_path_factory):
-    """Session-scoped SparkSession with Delta Lake configured."""
+    """Session-scoped SparkSession with Delta Lake configured.
+
+    Set SPARK_DATA_SIZE (e.g. "20g") to size memory and partitions for a
+    large local run instead of the small-fixture defaults. The ISBN and
+    email UDFs from vectorized_udfs are registered for use in SQL when
+    pandas and pyarrow are installed.
+    """
     warehouse_dir = str(tmp_path_factory.mktemp("warehouse"))
     derby_dir = str(tmp_path_factory.mktemp("derby"))
 
@@ -45,43 +37,59 @@ def spark_session(tmp_path_factory):
         .config("spark.sql.warehouse.dir", warehouse_dir)
         .config("spark.driver.extraJavaOptions", f"-Dderby.system.home={derby_dir}")
         .config("spark.sql.shuffle.partitions", "2")
+        .config("spark.scheduler.mode", "FAIR")
         .config("spark.ui.enabled", "false")
     )
+    if os.environ.get("SPARK_DATA_SIZE"):
+        builder = apply_profile(builder, plan_profile(parse_size(os.environ["SPARK_DATA_SIZE"])))
     session = configure_spark_with_delta_pip(builder).getOrCreate()
+    # Imported here, so pandas/pyarrow are only needed by tests that use the UDFs
+    try:
+        from tests.vectorized_udfs import register_udfs
+    except ImportError:
+        pass
+    else:
+        register_udfs(session)
 
     yield session
     session.stop()
 
 
+@pytest.fixture(scope="session")
+def medallion_ddl(spark_session):
+    """DDL statements for the bronze/silver/gold tables, adapted for local Spark.
+
+    Extracts DDL from the create_*.ipynb notebooks once per session. For
+    gold tables, strips GENERATED ALWAYS AS IDENTITY so they work in local
+    Spark. Cells that contain only comments (TODO placeholders) are skipped.
+    Every statement is parsed up front, so a syntax error in any DDL cell
+    fails the session with one report naming each broken cell.
+    """
+    return prepare_ddl(spark_session)
+
+
+@pytest.fixture(scope="session")
+def layer_snapshots(spark_session):
+    """Populated layer states, built once per session and restored by shallow clone."""
+    snapshots = LayerSnapshots(spark_session)
+    yield snapshots
+    snapshots.drop_all()
+
+
 @pytest.fixture()
-def spark(spark_session):
+def spark(spark_session, medallion_ddl):
     """SparkSession with bronze/silver/gold schemas and tables.
 
-    Extracts DDL from the create_*.ipynb notebooks and runs it. For gold
-    tables, strips GENERATED ALWAYS AS IDENTITY so they work in local Spark.
-    Cells that contain only comments (TODO placeholders) are skipped.
-    Tables are torn down after each test.
+    Runs the DDL from the medallion_ddl fixture. Tables are torn down after
+    each test.
     """
     # Create schemas
     spark_session.sql("CREATE SCHEMA IF NOT EXISTS bronze")
     spark_session.sql("CREATE SCHEMA IF NOT EXISTS silver")
     spark_session.sql("CREATE SCHEMA IF NOT EXISTS gold")
 
-    # Run DDL from each notebook
-    for ddl_path, needs_strip in [
-        (_BRONZE_DDL, False),
-        (_SILVER_DDL, False),
-        (_GOLD_DDL, True),
-    ]:
-        for sql in get_all_sql_cells(ddl_path):
-            sql = sql.strip()
-            if not sql or sql.startswith("CREATE SCHEMA") or "USE CATALOG" in sql or _is_only_comments(sql):
-                continue
-            if needs_strip:
-                sql = strip_identity(sql)
-            if "CREATE TABLE" in sql and "USING" not in sql:
-                sql = re.sub(r"\)\s*$", ") USING DELTA", sql)
-            spark_session.sql(sql)
+    for sql in medallion_ddl:
+        spark_session.sql(sql)
 
     yield spark_session
 
@@ -0,0 +1,14 @@
+"""Small Delta table lookups shared by the incremental maintenance modules."""
+
+
+def table_property(spark, table, key):
+    """Return a table property's value, or None if it is not set."""
+    for row in spark.sql(f"SHOW TBLPROPERTIES {table}").collect():
+        if row.key == key:
+            return row.value
+    return None
+
+
+def table_version(spark, table):
+    """Return the table's latest Delta version."""
+    return spark.sql(f"DESCRIBE HISTORY {table} LIMIT 1").collect()[0].version
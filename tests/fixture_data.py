@@ -0,0 +1,57 @@
+"""Declarative fixture data, written with one Delta commit per table.
+
+Fixtures describe their rows as plain Python values per table:
+
+    load_tables(spark, {
+        "silver.stores": [
+            ("S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701"),
+        ],
+        "gold.dim_store": (
+            ["store_id", "store_nbr", "name"],        # subset of columns;
+            [(1, "S001", "Downtown Books")],          # the rest are NULL
+        ),
+    })
+
+Each table is appended to with a single DataFrame write built against the
+table's own schema, instead of one `INSERT INTO ... VALUES` statement (and
+one Delta transaction plus SQL parse and job) per statement. Use NOW where
+the SQL fixtures used current_timestamp().
+"""
+
+from datetime import datetime
+
+NOW = object()
+
+
+def table_rows(spark, table, spec):
+    """Return a DataFrame of `spec`'s rows, shaped to `table`'s schema."""
+    columns, values = spec if isinstance(spec, tuple) else (None, spec)
+    schema = spark.table(table).schema
+    now = datetime.now()
+    if columns is None:
+        rows = [tuple(now if v is NOW else v for v in row) for row in values]
+    else:
+        unknown = set(columns) - set(schema.fieldNames())
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {sorted(unknown)}")
+        rows = []
+        for row in values:
+            by_name = dict(zip(columns, row))
+            rows.append(tuple(
+                now if by_name.get(f.name) is NOW else by_name.get(f.name)
+                for f in schema.fields
+            ))
+    return spark.createDataFrame(rows, schema)
+
+
+def load_tables(spark, tables):
+    """Append the rows for every table in `tables`, one commit per table.
+
+    `tables` maps a table name to either a list of row tuples in table
+    column order, or a (columns, rows) pair. Tables with no rows are skipped.
+    """
+    for table, spec in tables.items():
+        values = spec[1] if isinstance(spec, tuple) else spec
+        if not values:
+            continue
+        table_rows(spark, table, spec).write.format("delta").mode("append").saveAsTable(table)
@@ -0,0 +1,336 @@
+"""Pre-aggregated gold sales summaries and rollup query rewriting.
+
+Two aggregate tables sit on top of gold.fact_sales:
+
+* gold.agg_daily_sales   — one row per (date_id, store_id, book_id)
+* gold.agg_monthly_sales — one row per (year, month, category, genre,
+  order_channel), carrying quarter and yearmo along for free
+
+Both are maintained incrementally from the Delta change data feed of
+gold.fact_sales: only the dates (or months) touched since the last refresh
+are recomputed. The monthly table also copies attributes from dim_date and
+dim_book, so their change feeds count too: a book whose category or genre
+changed puts every month it sold in back in scope. The version of each
+source an aggregate was built from is kept in the aggregate's own table
+properties (fact_sales_version, dim_book_version, ...).
+
+rollup_sql() sends a rollup query to the smallest table that can answer it.
+"""
+
+from collections import namedtuple
+
+from tests.delta_tables import table_property, table_version
+
+_FACT = "gold.fact_sales"
+
+# Dimension aliases follow the sample analytics queries in week6_lab.ipynb.
+_DIMENSIONS = {
+    "d": ("gold.dim_date", "date_id"),
+    "b": ("gold.dim_book", "book_id"),
+    "s": ("gold.dim_store", "store_id"),
+    "c": ("gold.dim_customer", "customer_id"),
+}
+
+# Additive measures: name -> (expression over fact_sales, re-aggregation)
+MEASURES = {
+    "total_sales": ("SUM(f.line_total)", "SUM"),
+    "total_units": ("SUM(f.quantity)", "SUM"),
+    "line_items": ("COUNT(*)", "SUM"),
+}
+
+Aggregate = namedtuple(
+    "Aggregate", ["table", "grain", "columns", "joins", "copied", "scope"]
+)
+Aggregate.__doc__ = """An aggregate table definition.
+
+table   -- fully qualified table name
+grain   -- attributes (alias.column) the table is grouped by
+columns -- attributes stored directly on the table, mapped to their column
+joins   -- dimension aliases reachable through a surrogate key on the table
+copied  -- dimension aliases whose attributes are stored on the table
+scope   -- the grain column whose values are recomputed on refresh
+"""
+
+DAILY_SALES = Aggregate(
+    table="gold.agg_daily_sales",
+    grain=["f.date_id", "f.store_id", "f.book_id"],
+    columns={
+        "f.date_id": "date_id",
+        "f.store_id": "store_id",
+        "f.book_id": "book_id",
+        "d.date_id": "date_id",
+        "s.store_id": "store_id",
+        "b.book_id": "book_id",
+    },
+    joins=["d", "s", "b"],
+    copied=[],
+    scope="date_id",
+)
+
+MONTHLY_SALES = Aggregate(
+    table="gold.agg_monthly_sales",
+    grain=["d.year", "d.month", "b.category", "b.genre", "f.order_channel"],
+    columns={
+        "d.year": "year",
+        "d.quarter": "quarter",
+        "d.month": "month",
+        "d.yearmo": "yearmo",
+        "b.category": "category",
+        "b.genre": "genre",
+        "f.order_channel": "order_channel",
+    },
+    joins=[],
+    copied=["d", "b"],
+    scope="yearmo",
+)
+
+# Smallest first: rollup_sql() picks the first one that covers a query.
+AGGREGATES = [MONTHLY_SALES, DAILY_SALES]
+
+_DDL = {
+    DAILY_SALES.table: """
+        CREATE TABLE IF NOT EXISTS gold.agg_daily_sales (
+            date_id INT,
+            store_id BIGINT,
+            book_id BIGINT,
+            total_sales DECIMAL(20,2),
+            total_units BIGINT,
+            line_items BIGINT
+        ) USING DELTA
+    """,
+    MONTHLY_SALES.table: """
+        CREATE TABLE IF NOT EXISTS gold.agg_monthly_sales (
+            yearmo INT,
+            year SMALLINT,
+            quarter TINYINT,
+            month TINYINT,
+            category STRING,
+            genre STRING,
+            order_channel STRING,
+            total_sales DECIMAL(20,2),
+            total_units BIGINT,
+            line_items BIGINT
+        ) USING DELTA
+    """,
+}
+
+
+def create_aggregate_tables(spark):
+    """Create the aggregate tables and enable the change feed on their sources."""
+    for ddl in _DDL.values():
+        spark.sql(ddl)
+    for table in _sources(*AGGREGATES):
+        if table_property(spark, table, "delta.enableChangeDataFeed") != "true":
+            spark.sql(
+                f"ALTER TABLE {table} SET TBLPROPERTIES (delta.enableChangeDataFeed = true)"
+            )
+
+
+def refresh_aggregates(spark, full=False):
+    """Bring every aggregate table up to date with its sources.
+
+    Only the dates/months touched since the previous refresh are recomputed,
+    unless `full` is set or an aggregate has never been built. Returns a dict
+    of table name -> number of scope values recomputed (None for a full
+    rebuild).
+    """
+    create_aggregate_tables(spark)
+    current = {table: table_version(spark, table) for table in _sources(*AGGREGATES)}
+    refreshed = {}
+    for agg in AGGREGATES:
+        built_from = {table: _built_version(spark, agg, table) for table in _sources(agg)}
+        wanted = {table: current[table] for table in built_from}
+        if full or None in built_from.values():
+            _rebuild(spark, agg, None)
+            refreshed[agg.table] = None
+        else:
+            dates = set()
+            for table, version in built_from.items():
+                if version < wanted[table]:
+                    dates.update(_changed_date_ids(spark, table, version + 1))
+            scope = _scope_values(spark, agg, dates)
+            if scope:
+                _rebuild(spark, agg, scope)
+            refreshed[agg.table] = len(scope)
+        if built_from != wanted:
+            properties = ", ".join(
+                f"'{_version_property(table)}' = '{version}'" for table, version in wanted.items()
+            )
+            spark.sql(f"ALTER TABLE {agg.table} SET TBLPROPERTIES ({properties})")
+    return refreshed
+
+
+def choose_aggregate(attributes):
+    """Return the smallest aggregate that can answer a rollup over `attributes`.
+
+    Attributes are `alias.column` strings using the aliases of the sample
+    queries (f, d, b, s, c). Returns None when only fact_sales can answer.
+    """
+    for agg in AGGREGATES:
+        if all(_covers(agg, attr) for attr in attributes):
+            return agg
+    return None
+
+
+def rollup_sql(group_by, measures=("total_sales",), filters=None):
+    """Build a rollup query routed to the smallest table that can answer it.
+
+    `group_by` and the keys of `filters` are `alias.column` attributes;
+    `filters` values are matched with equality. Output columns are named
+    after the bare column name (e.g. `d.year` -> `year`).
+    """
+    filters = filters or {}
+    unknown = [m for m in measures if m not in MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown measures: {unknown}")
+
+    agg = choose_aggregate(list(group_by) + list(filters))
+    if agg is None:
+        source, resolve = _fact_source(list(group_by) + list(filters))
+        measure_sql = [f"{MEASURES[m][0]} AS {m}" for m in measures]
+    else:
+        source, resolve = _aggregate_source(agg, list(group_by) + list(filters))
+        measure_sql = [f"{MEASURES[m][1]}(a.{m}) AS {m}" for m in measures]
+
+    select = [f"{resolve(attr)} AS {attr.split('.', 1)[1]}" for attr in group_by]
+    sql = f"SELECT {', '.join(select + measure_sql)}\nFROM {source}"
+    if filters:
+        predicates = [f"{resolve(attr)} = {_literal(v)}" for attr, v in filters.items()]
+        sql += "\nWHERE " + " AND ".join(predicates)
+    if group_by:
+        sql += "\nGROUP BY " + ", ".join(resolve(attr) for attr in group_by)
+    return sql
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _covers(agg, attr):
+    alias = attr.split(".", 1)[0]
+    return attr in agg.columns or alias in agg.joins
+
+
+def _aggregate_source(agg, attributes):
+    aliases = sorted({a.split(".", 1)[0] for a in attributes if a not in agg.columns})
+    source = f"{agg.table} a"
+    for alias in aliases:
+        table, key = _DIMENSIONS[alias]
+        source += f"\nJOIN {table} {alias} ON a.{key} = {alias}.{key}"
+
+    def resolve(attr):
+        return f"a.{agg.columns[attr]}" if attr in agg.columns else attr
+
+    return source, resolve
+
+
+def _fact_source(attributes):
+    aliases = sorted({a.split(".", 1)[0] for a in attributes} - {"f"})
+    source = f"{_FACT} f"
+    for alias in aliases:
+        table, key = _DIMENSIONS[alias]
+        source += f"\nJOIN {table} {alias} ON f.{key} = {alias}.{key}"
+    return source, lambda attr: attr
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def _sources(*aggs):
+    """Tables the aggregates are computed from: fact_sales, then copied dimensions."""
+    tables = [_FACT]
+    for agg in aggs:
+        tables += [_DIMENSIONS[a][0] for a in agg.copied if _DIMENSIONS[a][0] not in tables]
+    return tables
+
+
+def _version_property(table):
+    return f"{table.split('.', 1)[1]}_version"
+
+
+def _built_version(spark, agg, table):
+    version = table_property(spark, agg.table, _version_property(table))
+    return None if version is None else int(version)
+
+
+def _changed_date_ids(spark, table, starting_version):
+    """Return the date_ids of fact rows affected by changes to `table` since a version.
+
+    For fact_sales that is the date_id of every row inserted, updated or
+    deleted; for a dimension, the dates of the fact rows that reference a
+    changed dimension row.
+    """
+    changes = (
+        spark.read.format("delta")
+        .option("readChangeFeed", "true")
+        .option("startingVersion", starting_version)
+        .table(table)
+    )
+    if table == _FACT:
+        dates = changes.select("date_id")
+    else:
+        key = next(k for t, k in _DIMENSIONS.values() if t == table)
+        dates = spark.table(_FACT).join(changes.select(key).distinct(), key).select("date_id")
+    return [r.date_id for r in dates.distinct().collect() if r.date_id is not None]
+
+
+def _scope_values(spark, agg, date_ids):
+    if not date_ids or agg.scope == "date_id":
+        return sorted(date_ids)
+    ids = ", ".join(str(d) for d in date_ids)
+    rows = spark.sql(f"""
+        SELECT DISTINCT {agg.scope} AS v FROM gold.dim_date WHERE date_id IN ({ids})
+    """).collect()
+    return sorted(r.v for r in rows)
+
+
+def _source_query(agg):
+    """SELECT computing `agg` from fact_sales at its own grain."""
+    measures = ",\n               ".join(
+        f"{expr} AS {name}" for name, (expr, _) in MEASURES.items()
+    )
+    if agg is DAILY_SALES:
+        return f"""
+            SELECT f.date_id, f.store_id, f.book_id,
+                   {measures}
+            FROM {_FACT} f
+            GROUP BY f.date_id, f.store_id, f.book_id
+        """
+    return f"""
+        SELECT d.yearmo, d.year, d.quarter, d.month,
+               b.category, b.genre, f.order_channel,
+               {measures}
+        FROM {_FACT} f
+        JOIN gold.dim_date d ON f.date_id = d.date_id
+        JOIN gold.dim_book b ON f.book_id = b.book_id
+        GROUP BY d.yearmo, d.year, d.quarter, d.month,
+                 b.category, b.genre, f.order_channel
+    """
+
+
+def _rebuild(spark, agg, scope):
+    """Recompute `agg`, either fully or only for the given scope values.
+
+    A MERGE keyed on the aggregate grain updates changed groups, inserts new
+    ones and deletes groups in scope that no longer have any fact rows.
+    """
+    if scope is None:
+        spark.sql(f"INSERT OVERWRITE {agg.table} {_source_query(agg)}")
+        return
+
+    values = ", ".join(str(v) for v in scope)
+    keys = [agg.columns[attr] for attr in agg.grain]
+    on = " AND ".join(f"t.{k} <=> s.{k}" for k in keys)
+    spark.sql(f"""
+        MERGE INTO {agg.table} t
+        USING (
+            SELECT * FROM ({_source_query(agg)}) WHERE {agg.scope} IN ({values})
+        ) s
+        ON {on}
+        WHEN MATCHED THEN UPDATE SET *
+        WHEN NOT MATCHED THEN INSERT *
+        WHEN NOT MATCHED BY SOURCE AND t.{agg.scope} IN ({values}) THEN DELETE
+    """)
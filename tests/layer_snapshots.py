@@ -0,0 +1,67 @@
+"""Session-wide snapshots of populated medallion layers, restored by clone.
+
+Gold tests need silver populated, silver tests need bronze populated. Rather
+than reloading the upstream layer for every test, a LayerSnapshots object
+builds each named state once per session:
+
+1. the first test to ask for a state clones the (still empty) live tables
+   into a snapshot schema (`layer_snapshots` by default) to copy their
+   schema, and loads the rows there (see fixture_data.load_tables), so the
+   snapshot owns its own data files;
+2. every test then gets the state with one
+   `CREATE OR REPLACE TABLE <live> SHALLOW CLONE <snapshot>` per table —
+   a metadata-only commit that copies no data.
+
+Writes made by a test land in the live table's own directory, so the
+snapshot (and every other test) is unaffected.
+"""
+
+from tests.fixture_data import load_tables
+
+SNAPSHOT_SCHEMA = "layer_snapshots"
+
+
+class LayerSnapshots:
+    """Builds and restores named layer states for one SparkSession."""
+
+    def __init__(self, spark, schema=SNAPSHOT_SCHEMA):
+        self.spark = spark
+        self.schema = schema
+        self._states = {}
+
+    def restore(self, state, tables):
+        """Populate the live tables for `state`, building its snapshot on first use.
+
+        `tables` is the load_tables() spec for the state. A state name must
+        always be restored with the same tables.
+        """
+        if state not in self._states:
+            self._build(state, tables)
+        elif self._states[state] != sorted(tables):
+            raise ValueError(
+                f"Layer state {state} was built for {self._states[state]}, "
+                f"not {sorted(tables)}"
+            )
+        for table in self._states[state]:
+            self.spark.sql(
+                f"CREATE OR REPLACE TABLE {table} SHALLOW CLONE {self._snapshot_name(state, table)}"
+            )
+
+    def drop_all(self):
+        self.spark.sql(f"DROP SCHEMA IF EXISTS {self.schema} CASCADE")
+        self._states.clear()
+
+    def _build(self, state, tables):
+        self.spark.sql(f"CREATE SCHEMA IF NOT EXISTS {self.schema}")
+        for table in tables:
+            self.spark.sql(
+                f"CREATE OR REPLACE TABLE {self._snapshot_name(state, table)} SHALLOW CLONE {table}"
+            )
+        load_tables(
+            self.spark,
+            {self._snapshot_name(state, table): spec for table, spec in tables.items()},
+        )
+        self._states[state] = sorted(tables)
+
+    def _snapshot_name(self, state, table):
+        return f"{self.schema}.{state}__{table.replace('.', '__')}"
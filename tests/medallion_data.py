@@ -0,0 +1,240 @@
+"""Shared layer fixture data for the medallion tests.
+
+create_bronze_source_views() sets up the raw CSV temp views the bronze cells
+read. The row sets are per table, in the form fixture_data.load_tables()
+takes. The week tests restore them as layer snapshots. Other tests (plan
+snapshots, gold aggregates, late data, ...) use them from here instead of
+importing from another test module.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from tests.fixture_data import NOW
+
+
+def create_bronze_source_views(spark):
+    """Create the 5 source CSV temp views the bronze cells read from."""
+    # stores_raw
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW stores_raw AS
+        SELECT 'S001' AS store_nbr, 'Downtown Books' AS name, '100 Main St' AS address,
+               'Springfield' AS city, 'IL' AS state, '62701' AS zip,
+               current_timestamp() AS ingestion_timestamp, 'stores.csv' AS source_filename
+        UNION ALL
+        SELECT 'S002', 'Airport Books', '200 Terminal Dr',
+               'Springfield', 'IL', '62702',
+               current_timestamp(), 'stores.csv'
+    """)
+
+    # categories_raw
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW categories_raw AS
+        SELECT '1' AS category_id, 'Fiction' AS category_name, '' AS parent_category_id,
+               current_timestamp() AS ingestion_timestamp, 'categories.csv' AS source_filename
+        UNION ALL
+        SELECT '3', 'Science Fiction', '1', current_timestamp(), 'categories.csv'
+        UNION ALL
+        SELECT '11', 'Space Opera', '3', current_timestamp(), 'categories.csv'
+    """)
+
+    # books_raw
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW books_raw AS
+        SELECT '978-0-00-000001-1' AS isbn, 'Test Book One' AS title,
+               'Author A' AS author, '11' AS category_id,
+               current_timestamp() AS ingestion_timestamp, 'books.csv' AS source_filename
+        UNION ALL
+        SELECT '978-0-00-000002-2', 'Test Book Two',
+               'Author B', '11',
+               current_timestamp(), 'books.csv'
+    """)
+
+    # online_orders_raw
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW online_orders_raw AS
+        SELECT
+            'ONL-001' AS order_id,
+            CAST('2025-06-15 10:00:00' AS TIMESTAMP) AS order_timestamp,
+            'alice@example.com' AS customer_email,
+            'Alice Smith' AS customer_name,
+            '123 Elm St' AS customer_address,
+            'Springfield' AS customer_city,
+            'IL' AS customer_state,
+            '62701' AS customer_zip,
+            '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":2,"unit_price":19.99}]' AS items,
+            'credit_card' AS payment_method,
+            CAST(39.98 AS DECIMAL(10,2)) AS total_amount,
+            current_timestamp() AS ingestion_timestamp,
+            'online_orders_1.csv' AS source_filename
+    """)
+
+    # instore_orders_raw
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW instore_orders_raw AS
+        SELECT
+            'INS-001' AS order_id,
+            CAST('2025-06-15 11:00:00' AS TIMESTAMP) AS transaction_timestamp,
+            'S001' AS store_nbr,
+            CAST(NULL AS STRING) AS customer_email,
+            '[{"isbn":"978-0-00-000002-2","title":"Test Book Two","quantity":1,"unit_price":24.99}]' AS items,
+            'cash' AS payment_method,
+            CAST(24.99 AS DECIMAL(10,2)) AS total_amount,
+            'Bob Jones' AS cashier_name,
+            current_timestamp() AS ingestion_timestamp,
+            'instore_orders_1.csv' AS source_filename
+    """)
+
+
+# --- bronze.categories: 3-level hierarchy ---
+_BRONZE_CATEGORIES = [
+    ("1",  "Fiction",         "",  NOW, "categories.csv"),
+    ("3",  "Science Fiction", "1", NOW, "categories.csv"),
+    ("11", "Space Opera",     "3", NOW, "categories.csv"),
+]
+
+# --- bronze.stores ---
+_BRONZE_STORES = [
+    ("S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701", NOW, "stores.csv"),
+]
+
+# --- bronze.books: 5 rows, only 2 should pass ISBN+title validation ---
+_BRONZE_BOOKS = [
+    ("978-0-00-000001-1", "Test Book One", "Author A", "11", NOW, "books.csv"),
+    ("978-0-00-000002-2", "Test Book Two", "Author B", "11", NOW, "books.csv"),
+    ("BADISBN",           "Bad ISBN Book", "Author C", "11", NOW, "books.csv"),
+    ("978-0-00-000004-4", "",              "Author D", "11", NOW, "books.csv"),
+    ("978-0-00-000005-5", "   ",           "Author E", "11", NOW, "books.csv"),
+]
+
+# --- bronze.online_orders: 2 orders from same customer, different timestamps ---
+_BRONZE_ONLINE_ORDERS = [
+    ("ONL-001", datetime(2025, 6, 1, 10, 0, 0),
+     "alice@example.com", "Alice Old", "100 Old St", "OldCity", "IL", "60001",
+     '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":2,"unit_price":19.99}]',
+     "credit_card", Decimal("39.98"), NOW, "online_orders_1.csv"),
+    ("ONL-002", datetime(2025, 7, 15, 14, 0, 0),
+     "alice@example.com", "Alice New", "200 New Ave", "NewCity", "IL", "60002",
+     '[{"isbn":"978-0-00-000002-2","title":"Test Book Two","quantity":1,"unit_price":24.99}]',
+     "debit_card", Decimal("24.99"), NOW, "online_orders_2.csv"),
+]
+
+# --- bronze.instore_orders: 2 orders ---
+# One with NULL email (should become 'in-store' sentinel)
+# One with email
+_BRONZE_INSTORE_ORDERS = [
+    ("INS-001", datetime(2025, 6, 15, 11, 0, 0), "S001", None,
+     '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":1,"unit_price":19.99}]',
+     "cash", Decimal("19.99"), "Bob Jones", NOW, "instore_orders_1.csv"),
+    ("INS-002", datetime(2025, 6, 16, 12, 0, 0), "S001", "bob@example.com",
+     '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":3,"unit_price":19.99},{"isbn":"978-0-00-000002-2","title":"Test Book Two","quantity":1,"unit_price":24.99}]',
+     "credit_card", Decimal("84.96"), "Jane Doe", NOW, "instore_orders_2.csv"),
+]
+
+BRONZE_DATA = {
+    "bronze.categories": _BRONZE_CATEGORIES,
+    "bronze.stores": _BRONZE_STORES,
+    "bronze.books": _BRONZE_BOOKS,
+    "bronze.online_orders": _BRONZE_ONLINE_ORDERS,
+    "bronze.instore_orders": _BRONZE_INSTORE_ORDERS,
+}
+
+# --- silver.categories: 3-level hierarchy ---
+_SILVER_CATEGORIES = [
+    ("1",  "Fiction",         ""),
+    ("3",  "Science Fiction", "1"),
+    ("11", "Space Opera",     "3"),
+]
+
+# --- silver.stores ---
+_SILVER_STORES = [
+    ("S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701"),
+]
+
+# --- silver.books ---
+_SILVER_BOOKS = [
+    ("978-0-00-000001-1", "Test Book One", "Author A", "11"),
+    ("978-0-00-000002-2", "Test Book Two", "Author B", "11"),
+]
+
+# --- silver.customers ---
+_SILVER_CUSTOMERS = [
+    ("alice@example.com", "Alice Smith", "123 Elm St",  "Springfield", "IL", "62701"),
+    ("bob@example.com",   "Bob Jones",   "456 Oak Ave", "Springfield", "IL", "62702"),
+]
+
+# --- silver.orders ---
+_SILVER_ORDERS = [
+    ("ONL-001", "online",   datetime(2025, 6, 15, 10, 0, 0),
+     "alice@example.com", "online", "credit_card", Decimal("39.98"), None),
+    ("ONL-002", "online",   datetime(2025, 6, 15, 14, 0, 0),
+     "bob@example.com", "online", "debit_card", Decimal("24.99"), None),
+    ("INS-001", "in-store", datetime(2025, 6, 15, 11, 0, 0),
+     "in-store", "S001", "cash", Decimal("19.99"), "Bob Jones"),
+    ("INS-002", "in-store", datetime(2025, 6, 16, 12, 0, 0),
+     "bob@example.com", "S001", "credit_card", Decimal("84.96"), "Jane Doe"),
+]
+
+# --- silver.order_items ---
+_SILVER_ORDER_ITEMS = [
+    ("ONL-001", "online",   "978-0-00-000001-1", 2, Decimal("19.99")),
+    ("ONL-002", "online",   "978-0-00-000002-2", 1, Decimal("24.99")),
+    ("INS-001", "in-store", "978-0-00-000001-1", 1, Decimal("19.99")),
+    ("INS-002", "in-store", "978-0-00-000001-1", 3, Decimal("19.99")),
+    ("INS-002", "in-store", "978-0-00-000002-2", 1, Decimal("24.99")),
+]
+
+SILVER_DATA = {
+    "silver.categories": _SILVER_CATEGORIES,
+    "silver.stores": _SILVER_STORES,
+    "silver.books": _SILVER_BOOKS,
+    "silver.customers": _SILVER_CUSTOMERS,
+    "silver.orders": _SILVER_ORDERS,
+    "silver.order_items": _SILVER_ORDER_ITEMS,
+}
+
+# Gold dimensions with known surrogate key values
+GOLD_DIMS = {
+    "gold.dim_customer": (
+        ["customer_id", "email", "name", "address", "city", "state", "zip"],
+        [
+            (1, "alice@example.com", "Alice Smith", "123 Elm St", "Springfield", "IL", "62701"),
+            (2, "bob@example.com", "Bob Jones", "456 Oak Ave", "Springfield", "IL", "62702"),
+            (3, "in-store", "In-Store Customer", None, None, None, None),
+        ],
+    ),
+    "gold.dim_store": (
+        ["store_id", "store_nbr", "name", "address", "city", "state", "zip"],
+        [
+            (1, "S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701"),
+            (2, "online", "Online", None, None, None, None),
+        ],
+    ),
+    "gold.dim_book": (
+        ["book_id", "isbn", "title", "author", "subgenre", "genre", "category"],
+        [
+            (1, "978-0-00-000001-1", "Test Book One", "Author A", "Space Opera", "Science Fiction", "Fiction"),
+            (2, "978-0-00-000002-2", "Test Book Two", "Author B", "Space Opera", "Science Fiction", "Fiction"),
+        ],
+    ),
+    # dim_date — just the dates we need
+    "gold.dim_date": (
+        ["date_id", "full_date", "day_of_week", "day_num_in_month",
+         "day_name", "day_abbrev", "weekday_flag", "week_num_in_year", "week_begin_date",
+         "week_begin_date_key", "month", "month_name", "month_abbrev", "quarter", "year",
+         "yearmo", "fiscal_month", "fiscal_quarter", "fiscal_year",
+         "last_day_in_month_flag", "same_day_year_ago_date"],
+        [
+            (20250615, date(2025, 6, 15), 1, 15,
+             "Sunday", "Sun", "N", 24, date(2025, 6, 15),
+             20250615, 6, "June", "Jun", 2, 2025,
+             202506, 6, 2, 2025,
+             "N", date(2024, 6, 15)),
+            (20250616, date(2025, 6, 16), 2, 16,
+             "Monday", "Mon", "Y", 25, date(2025, 6, 16),
+             20250616, 6, "June", "Jun", 2, 2025,
+             202506, 6, 2, 2025,
+             "N", date(2024, 6, 16)),
+        ],
+    ),
+}
@@ -0,0 +1,235 @@
+"""Retry scheduling for MERGEs that race other writers on the same Delta table.
+
+Two bronze ingestion runs, or a gold load overlapping an OPTIMIZE, can both
+commit to a table between another writer's read and commit. Delta then
+fails the later MERGE with a concurrent-modification exception
+(ConcurrentAppendException, ConcurrentDeleteReadException, ...), which
+would otherwise abort the notebook. Delta aborts the losing commit, so
+none of its changes become visible; re-running the whole statement against
+the new table version is what makes retrying it safe.
+
+* run_with_retry() re-runs an action on conflicts with exponential backoff
+  and full jitter; any other error is raised immediately.
+* retrying_execute() wraps a pipeline_runner execute hook with that policy,
+  so run_pipeline() retries its steps instead of failing.
+* narrow_merge() restricts a MERGE to a range of one column, on both
+  sides: the source is filtered to the range and the ON clause gets the
+  same predicate on the target. Delta checks conflicts against the
+  partitions a transaction read, so writers narrowed to disjoint ranges of
+  a partition column no longer conflict at all, and on any column the
+  predicate lets data skipping read fewer files.
+"""
+
+import random
+import re
+import time
+from collections import namedtuple
+from datetime import date, datetime
+
+RetryPolicy = namedtuple("RetryPolicy", ["retries", "base_delay", "max_delay"])
+DEFAULT_POLICY = RetryPolicy(retries=6, base_delay=0.2, max_delay=5.0)
+
+# Delta exception classes and error classes that mean "another writer won"
+_CONFLICTS = [
+    "ConcurrentAppendException",
+    "ConcurrentDeleteReadException",
+    "ConcurrentDeleteDeleteException",
+    "ConcurrentTransactionException",
+    "ConcurrentWriteException",
+    "MetadataChangedException",
+    "DELTA_CONCURRENT_APPEND",
+    "DELTA_CONCURRENT_DELETE_READ",
+    "DELTA_CONCURRENT_DELETE_DELETE",
+    "DELTA_CONCURRENT_TRANSACTION",
+    "DELTA_CONCURRENT_WRITE",
+    "DELTA_METADATA_CHANGED",
+]
+
+
+def is_conflict(exc):
+    """Return True if `exc` is a retryable Delta concurrent-modification error."""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    text = str(exc)
+    return any(name in names or name in text for name in _CONFLICTS)
+
+
+def backoff_delay(attempt, policy=DEFAULT_POLICY):
+    """Full-jitter delay before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1)))
+
+
+def run_with_retry(action, policy=DEFAULT_POLICY, sleep=time.sleep):
+    """Call `action()` until it succeeds; returns (result, attempts).
+
+    Conflicts are retried up to `policy.retries` times; the last conflict is
+    re-raised once they are used up. `action` must re-run the whole write
+    (e.g. the MERGE statement), so each attempt reads the latest version.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return action(), attempt
+        except Exception as exc:
+            if not is_conflict(exc) or attempt > policy.retries:
+                raise
+            sleep(backoff_delay(attempt, policy))
+
+
+def merge_with_retry(spark, sql, policy=DEFAULT_POLICY):
+    """Run a MERGE (or any write statement) with conflict retries; returns (rows, attempts)."""
+    return run_with_retry(lambda: spark.sql(sql).collect(), policy)
+
+
+def retrying_execute(execute=None, policy=DEFAULT_POLICY, attempts=None):
+    """Wrap a run_pipeline() execute hook so steps retry on write conflicts.
+
+    If `attempts` is a dict, it is filled with {step name: attempts taken}.
+    """
+    execute = execute or (lambda session, step: session.sql(step.sql))
+
+    def run(spark, step):
+        result, taken = run_with_retry(lambda: execute(spark, step), policy)
+        if attempts is not None:
+            attempts[step.name] = taken
+        return result
+
+    return run
+
+
+def narrow_merge(sql, column, low, high=None):
+    """Return `sql` restricted to `column BETWEEN low AND high` on both sides.
+
+    The USING relation is wrapped in a filter on `column` and the same
+    predicate on the target is added to the ON clause. Filtering only the
+    target would turn a source row whose key exists outside the range into
+    a NOT MATCHED insert, i.e. a duplicate; here such a row is left out
+    instead. Source rows outside the range are not merged at all, so split a
+    batch by range and narrow one MERGE per range. With `high` omitted the
+    predicate is an equality.
+
+    The target and source are referred to by their aliases if they have
+    them; an unaliased source must be an unqualified name.
+    """
+    using = _top_level_keyword(sql, "USING", 0)
+    target = re.fullmatch(
+        r"\s*MERGE\s+INTO\s+([\w.`]+)(?:\s+(?:AS\s+)?(\w+))?\s*",
+        _without_comments(sql[:using]), re.IGNORECASE,
+    )
+    if target is None:
+        raise ValueError("Not a MERGE statement")
+    qualifier = target.group(2) or target.group(1)
+    source_start = using + len("USING")
+    on = _top_level_keyword(sql, "ON", source_start)
+    when = _top_level_keyword(sql, "WHEN", on)
+    if high is None:
+        bounds = f"= {_literal(low)}"
+    else:
+        bounds = f"BETWEEN {_literal(low)} AND {_literal(high)}"
+
+    relation, alias = _split_relation(_without_comments(sql[source_start:on]).strip())
+    if alias is None:
+        if not re.fullmatch(r"\w+", relation):
+            raise ValueError("Give the MERGE source an alias to narrow it")
+        alias = relation
+    source = f"(SELECT * FROM {relation} WHERE {column} {bounds}) {alias}"
+    condition = _without_comments(sql[on + len("ON"):when]).strip()
+    return (
+        f"{sql[:source_start]} {source}\n"
+        f"ON ({condition}) AND {qualifier}.{column} {bounds}\n{sql[when:]}"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _skip(sql, i):
+    """If a comment or quoted text starts at `i`, return the index just past it."""
+    if sql.startswith("--", i):
+        end = sql.find("\n", i)
+        return len(sql) if end == -1 else end + 1
+    if sql.startswith("/*", i):
+        end = sql.find("*/", i + 2)
+        return len(sql) if end == -1 else end + 2
+    if sql[i] in "'\"`":
+        end = i + 1
+        while end < len(sql) and sql[end] != sql[i]:
+            end += 2 if sql[end] == "\\" else 1
+        return min(end + 1, len(sql))
+    return None
+
+
+def _without_comments(sql):
+    out = []
+    i = 0
+    while i < len(sql):
+        skipped = _skip(sql, i)
+        if skipped is None:
+            out.append(sql[i])
+            i += 1
+            continue
+        if sql[i] in "'\"`":
+            out.append(sql[i:skipped])
+        else:
+            out.append(" ")
+        i = skipped
+    return "".join(out)
+
+
+def _top_level_keyword(sql, keyword, start):
+    """Index of the first `keyword` at parenthesis depth 0 from `start`.
+
+    Comments, string literals and quoted identifiers are skipped.
+    """
+    depth = 0
+    pattern = re.compile(rf"\b{keyword}\b", re.IGNORECASE)
+    i = start
+    while i < len(sql):
+        skipped = _skip(sql, i)
+        if skipped is not None:
+            i = skipped
+            continue
+        ch = sql[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0 and pattern.match(sql, i):
+            return i
+        i += 1
+    raise ValueError(f"No top-level {keyword} in MERGE statement")
+
+
+def _split_relation(text):
+    """Split a USING relation into (table name or parenthesized query, alias or None)."""
+    if text.startswith("("):
+        depth = 0
+        i = 0
+        while i < len(text):
+            skipped = _skip(text, i)
+            if skipped is not None:
+                i = skipped
+                continue
+            if text[i] == "(":
+                depth += 1
+            elif text[i] == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        relation, rest = text[:i + 1], text[i + 1:]
+    else:
+        relation, rest = re.match(r"((?:`[^`]*`|[\w.])+)(.*)", text, re.DOTALL).groups()
+    alias = re.fullmatch(r"\s*(?:AS\s+)?(\w+)\s*", rest, re.IGNORECASE)
+    return relation, alias.group(1) if alias else None
+
+
+def _literal(value):
+    if isinstance(value, datetime):
+        return f"TIMESTAMP'{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE'{value.isoformat()}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
@@ -30,6 +30,42 @@ def find_cell(notebook_path, tag):
     return None
 
 
+def find_tagged_cells(notebook_path):
+    """Return (tag, sql) pairs for every `-- @test:` cell, in notebook order.
+
+    As with find_cell(), the tag line is stripped from the returned SQL.
+    """
+    with open(notebook_path) as f:
+        nb = json.load(f)
+
+    results = []
+    for cell in nb["cells"]:
+        if cell["cell_type"] != "code":
+            continue
+        source = cell["source"]
+        if isinstance(source, list):
+            source = "".join(source)
+        match = re.match(r"-- @test:(\S+)", source)
+        if match:
+            lines = source.split("\n", 1)
+            results.append((match.group(1), lines[1] if len(lines) > 1 else ""))
+    return results
+
+
+def is_only_comments(sql):
+    """Return True if the SQL contains no executable statements (only comments/whitespace)."""
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("--"):
+            return False
+    return True
+
+
+def strip_sql_comments(sql):
+    """Remove `--` line comments from SQL."""
+    return "\n".join(line.split("--", 1)[0] for line in sql.splitlines())
+
+
 def get_all_sql_cells(notebook_path):
     """Return a list of all code cell sources from the notebook."""
     with open(notebook_path) as f:
@@ -0,0 +1,236 @@
+"""Compile the tagged medallion cells into one pipeline run per layer.
+
+Run cell by cell, a temporary view such as `orders_unified` or
+`order_items_exploded` is recomputed by every statement that reads it, and
+a MERGE with a WHEN MATCHED clause evaluates its source twice (once to find
+the files it touches, once to rewrite them). compile_pipeline() takes the
+Steps found by pipeline_runner.discover_steps() and works out, for every
+view:
+
+* how many times cell-by-cell execution evaluates its query, following
+  views built on views;
+* whether caching it would save work. Views are considered downstream
+  first, so a view only reached through an already-cached view is not
+  cached as well.
+
+run_compiled() then runs one layer (or all of them) in notebook order under
+a single job group. It caches each chosen view right after its defining
+cell, drops it after its last consumer, and returns a report with the
+evaluations saved and the jobs and tasks the run took.
+"""
+
+import re
+import time
+import uuid
+from collections import namedtuple
+
+from tests.notebook_utils import strip_sql_comments
+from tests.pipeline_runner import discover_steps
+from tests.spark_metrics import job_group
+
+CompiledPipeline = namedtuple(
+    "CompiledPipeline", ["steps", "layers", "persisted", "consumers", "evaluations"]
+)
+CompiledRun = namedtuple(
+    "CompiledRun", ["layer", "steps", "persisted", "evaluations_saved", "jobs", "tasks", "seconds"]
+)
+
+
+def is_view(name):
+    """Temp views have no schema qualifier; tables are schema.table."""
+    return "." not in name
+
+
+def compile_pipeline(steps=None):
+    """Return a CompiledPipeline for `steps` (default: the week 4-6 tagged cells).
+
+    `evaluations` maps each view to (cell-by-cell evaluations, compiled
+    evaluations). `layers` maps each step to its layer: the schema it
+    writes; for a view, the layer of its first consumer that has one;
+    otherwise the layer of the cell defining a view it reads. `consumers`
+    maps each view-defining step to the steps that read the view.
+    """
+    steps = discover_steps() if steps is None else steps
+    consumers = _view_consumers(steps)
+
+    persisted = set()
+    for view_step in reversed([s for s in steps if s.name in consumers]):
+        if _evaluations(view_step.name, consumers, persisted) >= 2:
+            persisted.add(view_step.name)
+
+    evaluations = {
+        _defined_view(view_step): (
+            _evaluations(view_step.name, consumers, set()),
+            _evaluations(view_step.name, consumers, persisted),
+        )
+        for view_step in steps
+        if view_step.name in consumers
+    }
+    return CompiledPipeline(
+        steps,
+        _layers(steps, consumers),
+        [s.name for s in steps if s.name in persisted],
+        {name: [c.name for c in readers] for name, readers in consumers.items()},
+        evaluations,
+    )
+
+
+def run_compiled(spark, pipeline=None, layer=None, execute=None):
+    """Run the pipeline's steps (only `layer`'s, if given) and return a CompiledRun.
+
+    `execute(spark, step)` runs a single step; it defaults to spark.sql().
+    Cached views are always uncached again, even if a step fails.
+    """
+    pipeline = compile_pipeline() if pipeline is None else pipeline
+    execute = execute or (lambda session, step: session.sql(step.sql))
+    steps = [s for s in pipeline.steps if layer is None or pipeline.layers[s.name] == layer]
+    names = [s.name for s in steps]
+    defined = {s.name: _defined_view(s) for s in steps if s.name in pipeline.persisted}
+    # Each cached view is dropped after the last step in this run that
+    # evaluates it, directly or through views built on it that are not cached
+    release = {}
+    for view_step in defined:
+        readers = _readers(view_step, pipeline, set(defined))
+        last = max((names.index(n) for n in readers if n in names), default=names.index(view_step))
+        release.setdefault(names[last], []).append(view_step)
+
+    sc = spark.sparkContext
+    group = f"pipeline-{layer or 'all'}-{uuid.uuid4().hex[:8]}"
+    cached = []
+    start = time.perf_counter()
+    with job_group(sc, group, f"compiled pipeline ({layer or 'all layers'})"):
+        try:
+            for step in steps:
+                execute(spark, step)
+                if step.name in defined:
+                    spark.sql(f"CACHE TABLE {defined[step.name]}")
+                    cached.append(defined[step.name])
+                for view_step in release.get(step.name, []):
+                    spark.sql(f"UNCACHE TABLE IF EXISTS {defined[view_step]}")
+                    cached.remove(defined[view_step])
+        finally:
+            for view in cached:
+                spark.sql(f"UNCACHE TABLE IF EXISTS {view}")
+    seconds = time.perf_counter() - start
+
+    jobs, tasks = _job_counts(sc, group)
+    # Only the evaluations this run's own steps make count towards its savings
+    by_name = {s.name: s for s in pipeline.steps}
+    run_consumers = {
+        name: [by_name[c] for c in readers if c in names]
+        for name, readers in pipeline.consumers.items()
+        if name in names
+    }
+    saved = sum(
+        _evaluations(name, run_consumers, set()) - _evaluations(name, run_consumers, set(defined))
+        for name in run_consumers
+    )
+    return CompiledRun(
+        layer, [s.name for s in steps], sorted(defined.values()), saved, jobs, tasks, seconds
+    )
+
+
+def format_report(pipeline):
+    """Return a plain-text table of view evaluations, cell by cell vs compiled."""
+    lines = [f"{'view':<32} {'cell-by-cell':>12} {'compiled':>9}"]
+    for view, (before, after) in pipeline.evaluations.items():
+        lines.append(f"{view:<32} {before:>12} {after:>9}")
+    before = sum(b for b, _ in pipeline.evaluations.values())
+    after = sum(a for _, a in pipeline.evaluations.values())
+    lines.append(f"{'total':<32} {before:>12} {after:>9}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _defined_view(step):
+    views = sorted(w for w in step.writes if is_view(w))
+    return views[0] if views else None
+
+
+def _view_consumers(steps):
+    """Return {view-defining step name: [steps that read that view]}."""
+    definer = {}
+    consumers = {}
+    for step in steps:
+        for name in step.reads:
+            if name in definer:
+                consumers[definer[name]].append(step)
+        view = _defined_view(step)
+        if view is not None:
+            definer[view] = step.name
+            consumers[step.name] = []
+    return consumers
+
+
+def _evaluations(view_step, consumers, persisted):
+    """How many times the view defined by `view_step` is computed."""
+    if view_step in persisted:
+        return 1
+    total = 0
+    for consumer in consumers[view_step]:
+        if consumer.name in consumers:
+            # Another lazy view: each of its evaluations re-runs this one
+            total += _evaluations(consumer.name, consumers, persisted)
+        elif _rewrites_matches(consumer.sql):
+            total += 2
+        else:
+            total += 1
+    return total
+
+
+def _rewrites_matches(sql):
+    # Insert-only MERGEs are planned as a single anti-join pass
+    sql = strip_sql_comments(sql)
+    return bool(
+        re.match(r"\s*MERGE\b", sql, re.IGNORECASE)
+        and re.search(r"\bWHEN\s+MATCHED\b", sql, re.IGNORECASE)
+    )
+
+
+def _readers(view_step, pipeline, cached):
+    """Names of the steps that evaluate `view_step`'s view, through uncached views."""
+    readers = []
+    for name in pipeline.consumers[view_step]:
+        readers.append(name)
+        if name in pipeline.consumers and name not in cached:
+            readers.extend(_readers(name, pipeline, cached))
+    return readers
+
+
+def _layers(steps, consumers):
+    layers = {}
+    for step in reversed(steps):
+        schemas = sorted({w.split(".")[0] for w in step.writes if not is_view(w)})
+        if schemas:
+            layers[step.name] = schemas[0]
+        else:
+            known = [layers[c.name] for c in consumers.get(step.name, []) if layers[c.name]]
+            layers[step.name] = known[0] if known else None
+    # Still unplaced (e.g. a view only read by a plain SELECT): take the
+    # layer of the cell that defines a view it reads
+    definer = {}
+    for step in steps:
+        if layers[step.name] is None:
+            upstream = [layers[definer[r]] for r in sorted(step.reads) if r in definer]
+            layers[step.name] = next((u for u in upstream if u), None)
+        view = _defined_view(step)
+        if view is not None:
+            definer[view] = step.name
+    return {step.name: layers[step.name] or "default" for step in steps}
+
+
+def _job_counts(sc, group):
+    sc._jsc.sc().listenerBus().waitUntilEmpty()
+    tracker = sc.statusTracker()
+    job_ids = tracker.getJobIdsForGroup(group)
+    tasks = 0
+    for job_id in job_ids:
+        info = tracker.getJobInfo(job_id)
+        for stage_id in info.stageIds if info is not None else []:
+            stage = tracker.getStageInfo(stage_id)
+            if stage is not None:
+                tasks += stage.numTasks
+    return len(job_ids), tasks
@@ -0,0 +1,206 @@
+"""Dependency-aware runner for the tagged medallion steps.
+
+discover_steps() reads the `-- @test:` cells of the week 4-6 lab notebooks
+and works out which tables and temp views each one reads and writes.
+build_graph() turns that into a DAG, and run_pipeline() executes it on a
+single SparkSession: every step whose dependencies have finished is
+submitted to a thread pool, and each thread tags its Spark jobs with a FAIR
+scheduler pool so independent steps (e.g. silver stores, categories, books
+and customers) share the cluster instead of queueing behind each other.
+"""
+
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from tests.notebook_utils import find_tagged_cells, is_only_comments, strip_sql_comments
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEDALLION_NOTEBOOKS = [
+    os.path.join(_REPO_ROOT, "labs", "week4", "week4_lab.ipynb"),
+    os.path.join(_REPO_ROOT, "labs", "week5", "week5_lab.ipynb"),
+    os.path.join(_REPO_ROOT, "labs", "week6", "week6_lab.ipynb"),
+]
+
+Step = namedtuple("Step", ["name", "sql", "reads", "writes"])
+StepTiming = namedtuple("StepTiming", ["name", "pool", "start", "end"])
+RunReport = namedtuple(
+    "RunReport", ["timings", "critical_path", "critical_path_seconds", "wall_seconds"]
+)
+
+_WRITE_PATTERNS = [
+    r"\bMERGE\s+INTO\s+([\w.`]+)",
+    r"\bINSERT\s+(?:OVERWRITE|INTO)\s+(?:TABLE\s+)?([\w.`]+)",
+    r"\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL\s+)?TEMP(?:ORARY)?\s+)?"
+    r"(?:VIEW|TABLE)\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.`]+)",
+    r"\bUPDATE\s+([\w.`]+)\s+SET\b",
+    r"\bDELETE\s+FROM\s+([\w.`]+)",
+]
+# The trailing \b stops the name from backtracking past a function call
+# such as read_files(...).
+_READ_PATTERN = r"\b(?:FROM|JOIN|USING)\s+([\w.`]+)\b(?!\s*\()"
+_NOT_TABLES = {"delta", "select", "lateral", "values"}
+# Functions whose arguments use FROM without naming a table, e.g.
+# EXTRACT(YEAR FROM order_date) or TRIM(BOTH ' ' FROM name).
+_FROM_FUNCTIONS = {"extract", "trim", "ltrim", "rtrim", "btrim", "substring", "position", "overlay"}
+
+
+def table_references(sql):
+    """Return (reads, writes) — the sets of table/view names a statement touches."""
+    sql = strip_sql_comments(sql)
+    writes = set()
+    for pattern in _WRITE_PATTERNS:
+        writes.update(m.lower().strip("`") for m in re.findall(pattern, sql, re.IGNORECASE))
+    reads = {
+        m.lower().strip("`")
+        for m in re.findall(_READ_PATTERN, _mask_from_functions(sql), re.IGNORECASE)
+    }
+    reads -= _NOT_TABLES
+    # MERGE INTO t ... / DELETE FROM t read their own target, which is not an
+    # upstream dependency.
+    reads -= writes
+    return reads, writes
+
+
+def discover_steps(notebook_paths=None):
+    """Return a Step for every tagged, non-empty cell, in notebook order."""
+    steps = []
+    for path in notebook_paths or MEDALLION_NOTEBOOKS:
+        for tag, sql in find_tagged_cells(path):
+            if is_only_comments(sql):
+                continue
+            reads, writes = table_references(sql)
+            steps.append(Step(tag, sql, reads, writes))
+    return steps
+
+
+def build_graph(steps):
+    """Return {step name: set of step names it must wait for}.
+
+    Dependencies follow notebook order: a step waits for every earlier step
+    that writes something it reads or writes, and for every earlier step
+    that reads something it writes. Tables read but never written by an
+    earlier step are treated as external inputs.
+    """
+    graph = {}
+    for i, step in enumerate(steps):
+        deps = set()
+        for earlier in steps[:i]:
+            if earlier.writes & (step.reads | step.writes) or earlier.reads & step.writes:
+                deps.add(earlier.name)
+        graph[step.name] = deps
+    return graph
+
+
+def critical_path(graph, durations):
+    """Return (path, seconds) of the longest dependency chain by duration."""
+    finish = {}
+    via = {}
+
+    def visit(name):
+        if name not in finish:
+            best = max(graph[name], key=visit, default=None)
+            via[name] = best
+            finish[name] = durations[name] + (finish[best] if best else 0.0)
+        return finish[name]
+
+    if not graph:
+        return [], 0.0
+    end = max(graph, key=visit)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = via[end]
+    return path[::-1], finish[path[0]]
+
+
+def run_pipeline(spark, steps=None, max_workers=4, execute=None):
+    """Run `steps` concurrently in dependency order and return a RunReport.
+
+    `execute(spark, step)` runs a single step; it defaults to spark.sql().
+    Each step runs in the FAIR pool named after the schema it writes to.
+    At most `max_workers` steps are submitted at a time, so none sit queued
+    in the pool: if a step fails, no new steps are started and the error is
+    re-raised once the steps already running have finished.
+    """
+    steps = discover_steps() if steps is None else steps
+    execute = execute or (lambda session, step: session.sql(step.sql))
+    graph = build_graph(steps)
+    by_name = {s.name: s for s in steps}
+    timings = {}
+
+    def run(step):
+        pool = _pool_for(step)
+        sc = spark.sparkContext
+        sc.setLocalProperty("spark.scheduler.pool", pool)
+        sc.setJobDescription(step.name)
+        start = time.perf_counter()
+        try:
+            execute(spark, step)
+        finally:
+            sc.setLocalProperty("spark.scheduler.pool", None)
+            sc.setJobDescription(None)
+        timings[step.name] = StepTiming(step.name, pool, start, time.perf_counter())
+
+    started = time.perf_counter()
+    done = set()
+    pending = list(graph)
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            if error is None:
+                ready = [n for n in pending if graph[n] <= done]
+                for name in ready[:max_workers - len(running)]:
+                    pending.remove(name)
+                    running[executor.submit(run, by_name[name])] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None and error is None:
+                    error = (name, future.exception())
+                done.add(name)
+    if error is not None:
+        raise RuntimeError(f"Pipeline step {error[0]} failed") from error[1]
+
+    durations = {n: t.end - t.start for n, t in timings.items()}
+    path, seconds = critical_path(graph, durations)
+    return RunReport(
+        [timings[n] for n in sorted(timings, key=lambda n: timings[n].start)],
+        path,
+        seconds,
+        time.perf_counter() - started,
+    )
+
+
+def _mask_from_functions(sql):
+    """Blank out string literals and the arguments of _FROM_FUNCTIONS calls."""
+    out = list(sql)
+    calls = []  # one entry per open parenthesis: is it a _FROM_FUNCTIONS call?
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if ch == "'":
+            end = sql.find("'", i + 1)
+            end = len(sql) - 1 if end == -1 else end
+            out[i:end + 1] = " " * (end + 1 - i)
+            i = end + 1
+            continue
+        if ch == "(":
+            name = re.search(r"(\w+)\s*$", sql[max(0, i - 40):i])
+            calls.append(bool(name) and name.group(1).lower() in _FROM_FUNCTIONS)
+        elif ch == ")" and calls:
+            calls.pop()
+        elif any(calls):
+            out[i] = " "
+        i += 1
+    return "".join(out)
+
+
+def _pool_for(step):
+    schemas = sorted({t.split(".")[0] for t in step.writes if "." in t})
+    return schemas[0] if schemas else "default"
@@ -0,0 +1,218 @@
+"""Physical plan snapshots for the tagged medallion cells.
+
+capture_plans() walks the `@test:` cells of the week 4-6 labs in order and
+records the physical plan of the query each one runs:
+
+* CREATE VIEW ... AS q / INSERT ... q  -> q
+* MERGE INTO t USING s ON c ...        -> s LEFT JOIN t ON c (the lookup MERGE does)
+
+Plans are captured with adaptive execution off, so they show the join
+strategies and exchanges Spark picks up front, and normalized so that
+expression IDs, plan IDs, paths and folded timestamps do not cause churn.
+Size-based broadcasting is off too: every fixture table is a few KB, so
+under the default threshold each join would broadcast whatever the SQL
+says, while in production only the dimensions fit. With it off, a join
+plans as it would between two large tables unless the cell hints
+BROADCAST, so the golden records every join a cell does and which ones are
+hinted. Callers should load the layers first (the test restores the
+bronze, silver and gold fixture rows) so no scan is planned as empty.
+
+Golden copies live in tests/plan_snapshots/<tag>.txt. compare_plans()
+reports structural changes against them: new Exchange, SortMergeJoin or
+Window nodes, lost broadcast joins, lost filter pushdown, and any cartesian
+or nested-loop join. A cell without a golden fails the check; set
+UPDATE_PLAN_SNAPSHOTS=1 to (re)write the goldens, then commit them.
+"""
+
+import os
+import re
+from collections import Counter
+
+from tests.notebook_utils import find_tagged_cells, is_only_comments, strip_sql_comments
+from tests.pipeline_runner import MEDALLION_NOTEBOOKS
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plan_snapshots")
+
+# Operators whose appearance (or increase) is worth a reviewer's attention
+_WATCHED = ["Exchange", "SortMergeJoin", "ShuffledHashJoin", "Window", "Sort"]
+# Operators that are never expected in the medallion transforms
+_FORBIDDEN = ["CartesianProduct", "BroadcastNestedLoopJoin"]
+
+# Session settings for capture_plans(), restored afterwards
+_CAPTURE_CONF = {
+    "spark.sql.adaptive.enabled": "false",
+    "spark.sql.autoBroadcastJoinThreshold": "-1",
+}
+
+_NORMALIZERS = [
+    (re.compile(r"#\d+L?"), "#"),
+    (re.compile(r",?\s*\[plan_id=\d+\]"), ""),
+    (re.compile(r"\[id=#\d*\]"), ""),
+    (re.compile(r"\*\(\d+\)"), "*"),
+    (re.compile(r"Location: \w+ \[[^\]]*\]"), "Location: <path>"),
+    (re.compile(r"file:[^\s,\]]+"), "<path>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?"), "<timestamp>"),
+    (re.compile(r"\b(rand|randn|uuid|shuffle)\((-?\d+)?\)"), r"\1(<seed>)"),
+]
+
+
+def normalize_plan(plan):
+    """Strip run-specific details from a plan string."""
+    for pattern, replacement in _NORMALIZERS:
+        plan = pattern.sub(replacement, plan)
+    return "\n".join(line.rstrip() for line in plan.strip().splitlines()) + "\n"
+
+
+def plan_operators(plan):
+    """Return a Counter of physical operator names in a plan tree string."""
+    ops = Counter()
+    for line in plan.splitlines():
+        line = re.sub(r"^[\s:+\-|]*", "", line)
+        line = re.sub(r"^\*\s*", "", line)
+        match = re.match(r"([A-Z]\w+)", line)
+        if match:
+            ops[match.group(1)] += 1
+    return ops
+
+
+def _pushed_filters(plan):
+    return sum(
+        1 for m in re.findall(r"PushedFilters: \[([^\]]*)\]", plan) if m.strip()
+    )
+
+
+def compare_plans(golden, current):
+    """Return a list of human-readable structural regressions (empty if none)."""
+    issues = []
+    current_ops = plan_operators(current)
+    for op in _FORBIDDEN:
+        if current_ops[op]:
+            issues.append(f"{op} present ({current_ops[op]}x)")
+    if golden is None:
+        return issues
+
+    golden_ops = plan_operators(golden)
+    for op in _WATCHED:
+        if current_ops[op] > golden_ops[op]:
+            issues.append(f"{op} nodes {golden_ops[op]} -> {current_ops[op]}")
+    if current_ops["BroadcastHashJoin"] < golden_ops["BroadcastHashJoin"]:
+        issues.append(
+            f"BroadcastHashJoin nodes {golden_ops['BroadcastHashJoin']} -> "
+            f"{current_ops['BroadcastHashJoin']}"
+        )
+    if _pushed_filters(current) < _pushed_filters(golden):
+        issues.append(
+            f"scans with pushed filters {_pushed_filters(golden)} -> {_pushed_filters(current)}"
+        )
+    return issues
+
+
+def plan_query(sql):
+    """Return (query, defines_view) for a cell, or (None, False) if it has no query.
+
+    `defines_view` is True for CREATE VIEW cells, which capture_plans() runs
+    so later cells can reference the view.
+    """
+    sql = strip_sql_comments(sql).strip().rstrip(";")
+    view = re.match(
+        r"CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL\s+)?TEMP(?:ORARY)?\s+)?VIEW\s+"
+        r"(?:IF\s+NOT\s+EXISTS\s+)?[\w.`]+\s+AS\s+(.*)",
+        sql, re.IGNORECASE | re.DOTALL,
+    )
+    if view:
+        return view.group(1), True
+    insert = re.match(
+        r"INSERT\s+(?:OVERWRITE|INTO)\s+(?:TABLE\s+)?[\w.`]+\s*"
+        r"(?:\((?!\s*SELECT\b)[^)]*\)\s*)?(.*)",
+        sql, re.IGNORECASE | re.DOTALL,
+    )
+    if insert and not re.match(r"VALUES\b", insert.group(1), re.IGNORECASE):
+        return insert.group(1), False
+    if re.match(r"MERGE\s+INTO\b", sql, re.IGNORECASE):
+        return _merge_lookup_query(sql), False
+    if re.match(r"(SELECT|WITH)\b", sql, re.IGNORECASE):
+        return sql, False
+    return None, False
+
+
+def capture_plans(spark, notebook_paths=None):
+    """Return {tag: normalized physical plan} for every tagged cell with a query."""
+    plans = {}
+    previous = {key: spark.conf.get(key) for key in _CAPTURE_CONF}
+    for key, value in _CAPTURE_CONF.items():
+        spark.conf.set(key, value)
+    try:
+        for path in notebook_paths or MEDALLION_NOTEBOOKS:
+            for tag, sql in find_tagged_cells(path):
+                if is_only_comments(sql):
+                    continue
+                query, defines_view = plan_query(sql)
+                if query is None:
+                    continue
+                plan = spark.sql(query)._jdf.queryExecution().executedPlan().toString()
+                plans[tag] = normalize_plan(plan)
+                if defines_view:
+                    spark.sql(sql)
+    finally:
+        for key, value in previous.items():
+            spark.conf.set(key, value)
+    return plans
+
+
+def check_snapshots(spark, notebook_paths=None, snapshot_dir=SNAPSHOT_DIR, update=None):
+    """Compare captured plans with the golden files; returns {tag: [issues]}.
+
+    A missing golden is reported as an issue. Goldens are only written with
+    `update` (default: the UPDATE_PLAN_SNAPSHOTS environment variable), in
+    which case every golden is rewritten and only forbidden operators are
+    reported.
+    """
+    if update is None:
+        update = os.environ.get("UPDATE_PLAN_SNAPSHOTS") == "1"
+    results = {}
+    for tag, plan in capture_plans(spark, notebook_paths).items():
+        golden_path = os.path.join(snapshot_dir, f"{tag}.txt")
+        if update:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            with open(golden_path, "w") as f:
+                f.write(plan)
+            results[tag] = compare_plans(None, plan)
+        elif not os.path.exists(golden_path):
+            results[tag] = [f"no golden plan {golden_path} (set UPDATE_PLAN_SNAPSHOTS=1)"]
+        else:
+            with open(golden_path) as f:
+                results[tag] = compare_plans(f.read(), plan)
+    return results
+
+
+def _merge_lookup_query(sql):
+    target = re.match(
+        r"MERGE\s+INTO\s+([\w.`]+)(?:\s+(?:AS\s+)?(?!USING\b)(\w+))?\s+USING\s+",
+        sql, re.IGNORECASE,
+    )
+    # Without an alias the ON clause refers to the table names themselves
+    target_name, target_alias = target.group(1), target.group(2) or ""
+    rest = sql[target.end():]
+    if rest.startswith("("):
+        end = _matching_paren(rest)
+        source, rest = rest[:end + 1], rest[end + 1:]
+    else:
+        source, rest = re.match(r"([\w.`]+)(.*)", rest, re.DOTALL).groups()
+    alias = re.match(r"\s+(?:AS\s+)?(?!ON\b)(\w+)", rest, re.IGNORECASE)
+    source_alias = alias.group(1) if alias else ""
+    on = re.search(r"\bON\b(.*?)\bWHEN\b", rest, re.IGNORECASE | re.DOTALL)
+    source = f"{source} {source_alias}".strip()
+    target = f"{target_name} {target_alias}".strip()
+    return f"SELECT * FROM {source} LEFT JOIN {target} ON {on.group(1).strip()}"
+
+
+def _matching_paren(text):
+    depth = 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Unbalanced parentheses in MERGE source")
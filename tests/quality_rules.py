@@ -0,0 +1,248 @@
+"""Declarative data-quality rules for the bronze → silver tables.
+
+Each table has a list of rules. A rule is a SQL condition that is TRUE when
+a row violates it, optionally evaluated against a lookup subquery that is
+LEFT JOINed onto the table (referential integrity, order total cross-check).
+
+check_table() evaluates every rule for a table in a single query: one flag
+column per rule over one scan of the table. The flagged result is cached
+once and then used to compute per-rule violation counts and to write the
+failing rows to the quarantine table, so no rule triggers its own scan.
+"""
+
+from collections import namedtuple
+
+from pyspark.sql import functions as F
+
+VIOLATIONS_TABLE = "silver.dq_violations"
+QUARANTINE_TABLE = "silver.dq_quarantine"
+
+# Matches the silver.books check: '978-' followed by the remaining 10 digits,
+# optionally hyphenated.
+ISBN13_PATTERN = r"^978-([0-9]-?){9}[0-9]$"
+
+Rule = namedtuple("Rule", ["name", "condition", "lookup"], defaults=[None])
+Rule.__doc__ = """A data-quality rule.
+
+name      -- identifier, unique within a table
+condition -- SQL expression over `src` (and `lkp_<name>`) that is TRUE on violation
+lookup    -- optional (subquery, [(src column, lookup column), ...]) to LEFT JOIN
+"""
+
+DQResult = namedtuple("DQResult", ["table", "rows_checked", "violations", "quarantined"])
+
+
+def not_empty(column):
+    """Reject NULL, empty or whitespace-only values."""
+    return Rule(
+        f"{column}_not_empty",
+        f"src.{column} IS NULL OR trim(src.{column}) = ''",
+    )
+
+
+def not_null(column):
+    return Rule(f"{column}_not_null", f"src.{column} IS NULL")
+
+
+def matches(column, pattern, name=None):
+    """Reject values (after trimming) that do not match a regex."""
+    escaped = pattern.replace("\\", "\\\\").replace("'", "\\'")
+    return Rule(
+        name or f"{column}_format",
+        f"NOT coalesce(trim(src.{column}) RLIKE '{escaped}', false)",
+    )
+
+
+def valid_isbn(column):
+    """Reject ISBNs whose ISBN-10/13 checksum fails.
+
+    Uses the isbn_is_valid UDF (see vectorized_udfs), which must be
+    registered on the session.
+    """
+    return Rule(f"{column}_checksum", f"NOT coalesce(isbn_is_valid(src.{column}), false)")
+
+
+def normalized_email(column):
+    """Reject emails that are not trimmed and lower-case.
+
+    Such an email would not match its silver.customers row. Uses the
+    normalize_email UDF (see vectorized_udfs).
+    """
+    return Rule(
+        f"{column}_normalized",
+        f"src.{column} IS NOT NULL AND src.{column} <> coalesce(normalize_email(src.{column}), '')",
+    )
+
+
+def positive(column):
+    return Rule(f"{column}_positive", f"coalesce(src.{column} <= 0, true)")
+
+
+def references(columns, table, keys=None, allow=()):
+    """Reject rows whose key has no match in `table`.
+
+    `columns`/`keys` may be a single column name or a list for composite keys.
+    Values listed in `allow` (sentinels such as 'online') are accepted
+    without a lookup; they only apply to single-column references.
+    """
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    keys = columns if keys is None else ([keys] if isinstance(keys, str) else list(keys))
+    name = f"{'_'.join(columns)}_in_{table.split('.')[-1]}"
+    lkp = f"lkp_{name}"
+    subquery = f"SELECT DISTINCT {', '.join(keys)} FROM {table}"
+    condition = f"{lkp}.{keys[0]} IS NULL AND " + " AND ".join(
+        f"src.{c} IS NOT NULL" for c in columns
+    )
+    if allow:
+        sentinels = ", ".join(f"'{v}'" for v in allow)
+        condition += f" AND src.{columns[0]} NOT IN ({sentinels})"
+    return Rule(name, condition, (subquery, list(zip(columns, keys))))
+
+
+def total_matches_items():
+    """Cross-check silver.orders.total_amount against the sum of its line totals."""
+    name = "total_amount_matches_items"
+    subquery = """
+        SELECT order_id, order_channel, SUM(quantity * unit_price) AS items_total
+        FROM silver.order_items
+        GROUP BY order_id, order_channel
+    """
+    return Rule(
+        name,
+        f"lkp_{name}.items_total IS NOT NULL AND src.total_amount != lkp_{name}.items_total",
+        (subquery, [("order_id", "order_id"), ("order_channel", "order_channel")]),
+    )
+
+
+RULES = {
+    "bronze.books": [
+        not_empty("isbn"),
+        not_empty("title"),
+        matches("isbn", ISBN13_PATTERN, name="isbn_13_format"),
+    ],
+    "bronze.online_orders": [
+        not_empty("order_id"),
+        not_empty("customer_email"),
+        not_null("order_timestamp"),
+        not_null("total_amount"),
+    ],
+    "bronze.instore_orders": [
+        not_empty("order_id"),
+        not_empty("store_nbr"),
+        not_null("transaction_timestamp"),
+        not_null("total_amount"),
+    ],
+    "silver.books": [
+        references("category_id", "silver.categories"),
+    ],
+    "silver.orders": [
+        references("customer_email", "silver.customers", "email", allow=["in-store"]),
+        normalized_email("customer_email"),
+        references("store_nbr", "silver.stores", allow=["online"]),
+        total_matches_items(),
+    ],
+    "silver.order_items": [
+        references("isbn", "silver.books"),
+        references(["order_id", "order_channel"], "silver.orders"),
+        positive("quantity"),
+    ],
+}
+
+
+def create_dq_tables(spark):
+    spark.sql(f"""
+        CREATE TABLE IF NOT EXISTS {VIOLATIONS_TABLE} (
+            table_name STRING,
+            rule_name STRING,
+            violations BIGINT,
+            rows_checked BIGINT,
+            checked_at TIMESTAMP
+        ) USING DELTA
+    """)
+    spark.sql(f"""
+        CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+            table_name STRING,
+            failed_rules ARRAY<STRING>,
+            record STRING,
+            quarantined_at TIMESTAMP
+        ) USING DELTA
+    """)
+
+
+def flag_sql(table, rules=None):
+    """Return the single query that flags every rule violation for `table`."""
+    rules = RULES[table] if rules is None else rules
+    joins = []
+    flags = []
+    for rule in rules:
+        if rule.lookup is not None:
+            subquery, on = rule.lookup
+            alias = f"lkp_{rule.name}"
+            condition = " AND ".join(f"src.{c} = {alias}.{k}" for c, k in on)
+            joins.append(f"LEFT JOIN ({subquery}) {alias} ON {condition}")
+        flags.append(f"coalesce({rule.condition}, false) AS `_dq_{rule.name}`")
+    return "SELECT src.*,\n       " + ",\n       ".join(flags) + (
+        f"\nFROM {table} src\n" + "\n".join(joins)
+    )
+
+
+def check_table(spark, table, rules=None, quarantine=True, clean_view=None):
+    """Evaluate all rules for `table` in one pass and record the results.
+
+    Appends one row per rule to silver.dq_violations and, if `quarantine`
+    is set, every failing row (as JSON, with the names of the rules it
+    failed) to silver.dq_quarantine. If `clean_view` is given, a temp view
+    of the rows that passed every rule is registered under that name.
+    """
+    rules = RULES[table] if rules is None else rules
+    create_dq_tables(spark)
+
+    flagged = spark.sql(flag_sql(table, rules)).persist()
+    flag_cols = [f"_dq_{r.name}" for r in rules]
+    data_cols = [F.col(f"`{c}`") for c in flagged.columns if c not in flag_cols]
+    any_failed = F.lit(False)
+    for c in flag_cols:
+        any_failed = any_failed | F.col(f"`{c}`")
+    try:
+        counts = flagged.agg(
+            F.count(F.lit(1)).alias("rows_checked"),
+            F.sum(any_failed.cast("bigint")).alias("failed_rows"),
+            *[F.sum(F.col(f"`{c}`").cast("bigint")).alias(c) for c in flag_cols],
+        ).collect()[0]
+        rows_checked = counts["rows_checked"]
+        failed_rows = counts["failed_rows"] or 0
+        violations = {r.name: counts[f"_dq_{r.name}"] or 0 for r in rules}
+
+        spark.createDataFrame(
+            [(table, name, n, rows_checked) for name, n in violations.items()],
+            "table_name STRING, rule_name STRING, violations BIGINT, rows_checked BIGINT",
+        ).withColumn("checked_at", F.current_timestamp()) \
+            .write.format("delta").mode("append").saveAsTable(VIOLATIONS_TABLE)
+
+        quarantined = 0
+        if quarantine and failed_rows:
+            failed_rules = F.filter(
+                F.array(*[F.when(F.col(f"`_dq_{r.name}`"), F.lit(r.name)) for r in rules]),
+                lambda x: x.isNotNull(),
+            )
+            flagged.where(any_failed).select(
+                F.lit(table).alias("table_name"),
+                failed_rules.alias("failed_rules"),
+                F.to_json(F.struct(*data_cols)).alias("record"),
+                F.current_timestamp().alias("quarantined_at"),
+            ).write.format("delta").mode("append").saveAsTable(QUARANTINE_TABLE)
+            quarantined = failed_rows
+
+        if clean_view:
+            # Registered over the flag query itself, so the view stays valid
+            # after the cache is released below.
+            flagged.where(~any_failed).select(*data_cols).createOrReplaceTempView(clean_view)
+    finally:
+        flagged.unpersist()
+
+    return DQResult(table, rows_checked, violations, quarantined)
+
+
+def check_all(spark, tables=None, quarantine=True):
+    """Run check_table() for every table with rules; returns a list of DQResult."""
+    return [check_table(spark, t, quarantine=quarantine) for t in (tables or RULES)]
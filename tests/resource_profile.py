@@ -0,0 +1,161 @@
+"""Resource profiles for running the medallion pipeline on large local data.
+
+The conftest defaults (`local[*]`, 2 shuffle partitions, default driver
+memory) suit the small fixture data. With millions of orders the explode
+into order_items and the fact_sales joins put hundreds of megabytes into
+each shuffle partition, which spills heavily or runs the driver out of heap.
+
+plan_profile() sizes a local session from the expected data size and the
+machine:
+
+* driver heap and off-heap memory from physical memory, leaving headroom
+  for the OS and Python;
+* a target partition size that fits comfortably in one core's share of
+  execution memory;
+* shuffle partitions from the data size (allowing for the explode) and
+  that target, rounded to a multiple of the cores, with adaptive execution
+  coalescing small partitions and splitting skewed ones back to the target.
+
+Set SPARK_DATA_SIZE (e.g. "20g") to have the spark_session fixture use the
+profile. memory_report() summarises peak execution memory and spill per
+stage from a CellMetrics (see spark_metrics), plus each executor's peak JVM
+heap and off-heap use.
+"""
+
+import math
+import os
+import re
+from collections import namedtuple
+
+MB = 1024 * 1024
+
+ResourceProfile = namedtuple(
+    "ResourceProfile",
+    [
+        "cores",
+        "memory_bytes",
+        "data_bytes",
+        "heap_bytes",
+        "offheap_bytes",
+        "partition_bytes",
+        "shuffle_partitions",
+    ],
+)
+
+# Share of physical memory given to Spark; the rest is left for the OS,
+# Python workers and the page cache.
+_SPARK_MEMORY_SHARE = 0.6
+_OFFHEAP_SHARE = 0.25
+_RESERVED_HEAP = 300 * MB  # Spark's fixed reserved memory
+_MEMORY_FRACTION = 0.6     # spark.memory.fraction default
+_MIN_PARTITION = 16 * MB
+_MAX_PARTITION = 128 * MB
+_MAX_SHUFFLE_PARTITIONS = 4000
+
+
+def parse_size(size):
+    """Return bytes for a size such as 1024, "512m", "20g" or "1.5t"."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([kmgt]?)b?\s*", str(size), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {size!r}")
+    exponent = " kmgt".index(match.group(2).lower() or " ")
+    return int(float(match.group(1)) * 1024 ** exponent)
+
+
+def plan_profile(data_bytes, cores=None, memory_bytes=None, expansion=3.0):
+    """Return a ResourceProfile for `data_bytes` of input on this machine.
+
+    `expansion` allows for shuffles larger than the input: exploding each
+    order into its items and widening rows in the fact joins.
+    """
+    cores = cores or os.cpu_count() or 1
+    memory_bytes = memory_bytes or _physical_memory()
+
+    spark_bytes = int(memory_bytes * _SPARK_MEMORY_SHARE)
+    offheap_bytes = int(spark_bytes * _OFFHEAP_SHARE)
+    heap_bytes = max(spark_bytes - offheap_bytes, 1024 * MB)
+
+    # Concurrent tasks share the unified region (on-heap plus off-heap);
+    # aim for half of one core's share per partition.
+    execution_bytes = (heap_bytes - _RESERVED_HEAP) * _MEMORY_FRACTION + offheap_bytes
+    partition_bytes = int(min(max(execution_bytes / cores / 2, _MIN_PARTITION), _MAX_PARTITION))
+
+    wanted = math.ceil(data_bytes * expansion / partition_bytes)
+    shuffle_partitions = min(max(wanted, cores * 2), _MAX_SHUFFLE_PARTITIONS)
+    shuffle_partitions = math.ceil(shuffle_partitions / cores) * cores
+
+    return ResourceProfile(
+        cores,
+        memory_bytes,
+        data_bytes,
+        heap_bytes,
+        offheap_bytes,
+        partition_bytes,
+        shuffle_partitions,
+    )
+
+
+def spark_conf(profile):
+    """Return the Spark settings for a profile, as {key: string value}."""
+    return {
+        "spark.driver.memory": f"{profile.heap_bytes // MB}m",
+        "spark.memory.offHeap.enabled": "true",
+        "spark.memory.offHeap.size": f"{profile.offheap_bytes // MB}m",
+        "spark.sql.shuffle.partitions": str(profile.shuffle_partitions),
+        "spark.sql.files.maxPartitionBytes": str(profile.partition_bytes),
+        "spark.sql.adaptive.enabled": "true",
+        "spark.sql.adaptive.coalescePartitions.enabled": "true",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": str(profile.partition_bytes),
+        "spark.sql.adaptive.coalescePartitions.minPartitionSize": str(_MIN_PARTITION),
+        "spark.sql.adaptive.skewJoin.enabled": "true",
+    }
+
+
+def apply_profile(builder, profile):
+    """Set a profile's settings on a SparkSession builder (before the JVM starts)."""
+    for key, value in spark_conf(profile).items():
+        builder = builder.config(key, value)
+    return builder
+
+
+def memory_report(spark, metrics):
+    """Return a plain-text memory report for one CellMetrics.
+
+    One line per stage with tasks, peak execution memory and spill, then one
+    line per executor with its peak JVM heap and off-heap execution memory.
+    """
+    lines = [f"{'stage':>6} {'tasks':>6} {'peak exec MB':>13} {'mem spill MB':>13} {'disk spill MB':>14}"]
+    for stage in metrics.stages:
+        lines.append(
+            f"{stage['stage_id']:>6} {stage['tasks']:>6} "
+            f"{stage['peak_execution_memory'] / MB:>13.1f} "
+            f"{stage['memory_spill_bytes'] / MB:>13.1f} "
+            f"{stage['disk_spill_bytes'] / MB:>14.1f}"
+        )
+    for executor, peaks in executor_peak_memory(spark).items():
+        lines.append(
+            f"executor {executor}: peak heap {peaks['JVMHeapMemory'] / MB:.1f} MB, "
+            f"peak off-heap execution {peaks['OffHeapExecutionMemory'] / MB:.1f} MB"
+        )
+    return "\n".join(lines)
+
+
+def executor_peak_memory(spark):
+    """Return {executor id: {metric: peak bytes}} from the driver's status store."""
+    store = spark.sparkContext._jsc.sc().statusStore()
+    executors = store.executorList(True)
+    peaks = {}
+    for i in range(executors.size()):
+        summary = executors.apply(i)
+        metrics = summary.peakMemoryMetrics()
+        if not metrics.isDefined():
+            continue
+        peaks[summary.id()] = {
+            name: metrics.get().getMetricValue(name)
+            for name in ("JVMHeapMemory", "OffHeapExecutionMemory", "OnHeapExecutionMemory")
+        }
+    return peaks
+
+
+def _physical_memory():
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
@@ -0,0 +1,222 @@
+"""Spark metrics instrumentation for tagged notebook cells.
+
+cell_metrics() wraps the execution of one `@test:` cell in a Spark job
+group. When the cell finishes it reads, for every job in that group:
+
+* job, stage and task counts from the StatusTracker
+* input/output/shuffle bytes, spill, peak execution memory and
+  task-duration skew per stage from the driver's status store (the same
+  data the Spark UI shows; it is kept even when the UI is disabled)
+* the executed physical plan of the statement
+* the Delta commit (version, operation, operationMetrics) of every table
+  the cell wrote
+
+Collection is off unless a budget is passed or one of these environment
+variables is set:
+
+* CELL_METRICS_PATH   — append one JSON line per cell to this file
+* CELL_METRICS_BUDGET — JSON object of limits, e.g. {"max_shuffle_write_bytes": 1e6}
+
+A cell that exceeds a budget fails with an AssertionError.
+"""
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from tests.pipeline_runner import table_references
+
+_JOB_GROUP_PROPERTIES = ["spark.jobGroup.id", "spark.job.description", "spark.job.interruptOnCancel"]
+
+_STAGE_FIELDS = {
+    "input_bytes": "inputBytes",
+    "output_bytes": "outputBytes",
+    "shuffle_read_bytes": "shuffleReadBytes",
+    "shuffle_write_bytes": "shuffleWriteBytes",
+    "memory_spill_bytes": "memoryBytesSpilled",
+    "disk_spill_bytes": "diskBytesSpilled",
+}
+
+
+class CellMetrics:
+    """Metrics captured for a single cell. `result` is the DataFrame run in the cell."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.result = None
+        self.duration_s = None
+        self.jobs = 0
+        self.stages = []
+        self.plan = None
+        self.delta_commits = {}
+
+    def totals(self):
+        """Sum the per-stage byte counters and return the headline numbers."""
+        totals = {name: sum(s[name] for s in self.stages) for name in _STAGE_FIELDS}
+        totals["jobs"] = self.jobs
+        totals["stages"] = len(self.stages)
+        totals["tasks"] = sum(s["tasks"] for s in self.stages)
+        totals["task_skew"] = max((s["task_skew"] or 0.0 for s in self.stages), default=0.0)
+        totals["peak_execution_memory"] = max(
+            (s["peak_execution_memory"] for s in self.stages), default=0
+        )
+        totals["duration_s"] = self.duration_s
+        return totals
+
+    def to_dict(self):
+        return {
+            "tag": self.tag,
+            **self.totals(),
+            "stage_detail": self.stages,
+            "delta_commits": self.delta_commits,
+            "plan": self.plan,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), default=str)
+
+
+def check_budget(metrics, budget):
+    """Raise AssertionError if any `max_<metric>` limit in `budget` is exceeded."""
+    totals = metrics.totals()
+    over = []
+    for key, limit in budget.items():
+        name = key[len("max_"):] if key.startswith("max_") else key
+        if name not in totals:
+            raise KeyError(f"Unknown metric in budget: {key}")
+        if totals[name] is not None and totals[name] > limit:
+            over.append(f"{name}={totals[name]} (limit {limit})")
+    assert not over, f"Cell {metrics.tag} exceeded its budget: " + ", ".join(over)
+
+
+@contextmanager
+def job_group(sc, group, description):
+    """Run the block in job group `group`, then restore the caller's job group.
+
+    setJobGroup() sets three thread-local properties; all three are put back.
+    """
+    caller = {key: sc.getLocalProperty(key) for key in _JOB_GROUP_PROPERTIES}
+    sc.setJobGroup(group, description)
+    try:
+        yield
+    finally:
+        for key, value in caller.items():
+            sc.setLocalProperty(key, value)
+
+
+@contextmanager
+def cell_metrics(spark, tag, sql=None, budget=None):
+    """Collect Spark metrics for the statements run inside the block.
+
+    Pass the cell's `sql` so the tables it writes can be looked up in the
+    Delta history, and assign the statement's DataFrame to `metrics.result`
+    to capture its physical plan. Yields a CellMetrics (None when metrics
+    collection is disabled).
+    """
+    path = os.environ.get("CELL_METRICS_PATH")
+    if budget is None and os.environ.get("CELL_METRICS_BUDGET"):
+        budget = json.loads(os.environ["CELL_METRICS_BUDGET"])
+    if not path and not budget:
+        yield None
+        return
+
+    sc = spark.sparkContext
+    group = f"cell-{tag}-{uuid.uuid4().hex[:8]}"
+    writes = sorted(t for t in table_references(sql)[1] if "." in t) if sql else []
+    versions_before = {t: _delta_version(spark, t) for t in writes}
+
+    metrics = CellMetrics(tag)
+    with job_group(sc, group, tag):
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.duration_s = time.perf_counter() - start
+
+    _collect_stage_metrics(sc, group, metrics)
+    if metrics.result is not None:
+        metrics.plan = metrics.result._jdf.queryExecution().executedPlan().toString()
+    for table in writes:
+        commit = _latest_commit(spark, table)
+        if commit is not None and commit["version"] != versions_before[table]:
+            metrics.delta_commits[table] = commit
+
+    if path:
+        with open(path, "a") as f:
+            f.write(metrics.to_json() + "\n")
+    if budget:
+        check_budget(metrics, budget)
+
+
+def run_instrumented(spark, tag, sql, budget=None):
+    """Run a cell's SQL under cell_metrics(); returns (DataFrame, CellMetrics or None)."""
+    with cell_metrics(spark, tag, sql, budget) as metrics:
+        result = spark.sql(sql)
+        if metrics is not None:
+            metrics.result = result
+    return result, metrics
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _collect_stage_metrics(sc, group, metrics):
+    # Listener events are delivered asynchronously; drain the bus so the
+    # status store reflects every job in the group.
+    sc._jsc.sc().listenerBus().waitUntilEmpty()
+    tracker = sc.statusTracker()
+    store = sc._jsc.sc().statusStore()
+
+    stage_ids = set()
+    job_ids = tracker.getJobIdsForGroup(group)
+    metrics.jobs = len(job_ids)
+    for job_id in job_ids:
+        info = tracker.getJobInfo(job_id)
+        if info is not None:
+            stage_ids.update(info.stageIds)
+
+    for stage_id in sorted(stage_ids):
+        try:
+            data = store.lastStageAttempt(stage_id)
+        except Exception:  # skipped stages never reach the status store
+            continue
+        stage = {"stage_id": stage_id, "tasks": data.numTasks()}
+        for name, accessor in _STAGE_FIELDS.items():
+            stage[name] = getattr(data, accessor)()
+        stage["peak_execution_memory"] = data.peakExecutionMemory()
+        stage["task_skew"] = _task_skew(store, stage_id, data.attemptId(), data.numTasks())
+        metrics.stages.append(stage)
+
+
+def _task_skew(store, stage_id, attempt_id, num_tasks):
+    """Ratio of the slowest task's duration to the median (None if unknown)."""
+    tasks = store.taskList(stage_id, attempt_id, num_tasks)
+    durations = []
+    for i in range(tasks.size()):
+        duration = tasks.apply(i).duration()
+        if duration.isDefined():
+            durations.append(duration.get())
+    if not durations:
+        return None
+    durations.sort()
+    median = durations[len(durations) // 2]
+    return durations[-1] / median if median else None
+
+
+def _delta_version(spark, table):
+    commit = _latest_commit(spark, table)
+    return None if commit is None else commit["version"]
+
+
+def _latest_commit(spark, table):
+    if not spark.catalog.tableExists(table):
+        return None
+    row = spark.sql(f"DESCRIBE HISTORY {table} LIMIT 1").collect()[0]
+    return {
+        "version": row.version,
+        "operation": row.operation,
+        "metrics": dict(row.operationMetrics or {}),
+    }
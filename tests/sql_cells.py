@@ -0,0 +1,129 @@
+"""Parse-once preprocessing and validation for notebook SQL cells.
+
+Every statement the tests send to Spark comes from a notebook cell: DDL from
+the create_*.ipynb notebooks (rewritten for local Spark) and `@test:` cells
+from the labs. This module:
+
+* rewrites each cell once, caching the result by a hash of the cell source;
+* parses each rewritten statement once with the session's SQL parser
+  (which includes the Delta extensions), caching the verdict by statement
+  hash, so no cell is parsed twice in a session;
+* reports every unparseable cell in the notebook set at once, with the
+  notebook, cell and parser message, instead of failing on the first one
+  halfway through a test run.
+"""
+
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+from tests.notebook_utils import (
+    find_tagged_cells,
+    get_all_sql_cells,
+    is_only_comments,
+    strip_identity,
+)
+from tests.pipeline_runner import MEDALLION_NOTEBOOKS
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# DDL notebooks in creation order, and whether identity columns are stripped
+DDL_NOTEBOOKS = [
+    (os.path.join(_REPO_ROOT, "labs", "week4", "create_bronze.ipynb"), False),
+    (os.path.join(_REPO_ROOT, "labs", "week5", "create_silver.ipynb"), False),
+    (os.path.join(_REPO_ROOT, "labs", "week6", "create_gold.ipynb"), True),
+]
+
+CellDiagnostic = namedtuple("CellDiagnostic", ["notebook", "cell", "sql", "error"])
+
+_REWRITE_CACHE = {}  # hash of (cell source, strip flag) -> statement or None
+_PARSE_CACHE = {}    # hash of statement -> parser error message, or None
+
+
+def cell_hash(*parts):
+    """Return a stable hex digest for a cell source (plus any rewrite options)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def rewrite_ddl(sql, needs_strip=False):
+    """Return a DDL cell adapted for local Spark, or None if it should be skipped.
+
+    Skips empty and comment-only cells, CREATE SCHEMA and USE CATALOG; strips
+    identity columns when `needs_strip`; adds USING DELTA to CREATE TABLE
+    statements without a USING clause.
+    """
+    key = cell_hash(sql, needs_strip)
+    if key in _REWRITE_CACHE:
+        return _REWRITE_CACHE[key]
+    sql = sql.strip()
+    if not sql or sql.startswith("CREATE SCHEMA") or "USE CATALOG" in sql or is_only_comments(sql):
+        statement = None
+    else:
+        if needs_strip:
+            sql = strip_identity(sql)
+        if "CREATE TABLE" in sql and "USING" not in sql:
+            sql = re.sub(r"\)\s*$", ") USING DELTA", sql)
+        statement = sql
+    _REWRITE_CACHE[key] = statement
+    return statement
+
+
+def parse_error(spark, sql):
+    """Parse `sql` with the session's parser; return the error message, or None."""
+    key = cell_hash(sql)
+    if key not in _PARSE_CACHE:
+        try:
+            spark._jsparkSession.sessionState().sqlParser().parsePlan(sql)
+            _PARSE_CACHE[key] = None
+        except Exception as e:  # ParseException (or Py4JJavaError on older PySpark)
+            java_exception = getattr(e, "java_exception", None)
+            message = java_exception.getMessage() if java_exception is not None else str(e)
+            _PARSE_CACHE[key] = message.split("== SQL ==")[0].strip()
+    return _PARSE_CACHE[key]
+
+
+def format_diagnostics(diagnostics):
+    """Render diagnostics as one block, one entry per failing cell."""
+    lines = [f"{len(diagnostics)} notebook SQL cell(s) failed to parse:"]
+    for d in diagnostics:
+        first_line = d.sql.strip().splitlines()[0] if d.sql.strip() else ""
+        lines.append(f"  {os.path.relpath(d.notebook, _REPO_ROOT)} [{d.cell}] {first_line}")
+        lines.extend(f"      {line}" for line in d.error.splitlines())
+    return "\n".join(lines)
+
+
+def prepare_ddl(spark, notebooks=None):
+    """Return the rewritten DDL statements, in order, after parsing all of them.
+
+    Raises ValueError listing every cell that fails to parse.
+    """
+    statements, diagnostics = [], []
+    for path, needs_strip in notebooks or DDL_NOTEBOOKS:
+        for index, source in enumerate(get_all_sql_cells(path)):
+            sql = rewrite_ddl(source, needs_strip)
+            if sql is None:
+                continue
+            error = parse_error(spark, sql)
+            if error:
+                diagnostics.append(CellDiagnostic(path, f"cell {index}", sql, error))
+            statements.append(sql)
+    if diagnostics:
+        raise ValueError(format_diagnostics(diagnostics))
+    return statements
+
+
+def check_tagged_cells(spark, notebook_paths=None):
+    """Parse every non-placeholder `@test:` cell; return a list of CellDiagnostic."""
+    diagnostics = []
+    for path in notebook_paths or MEDALLION_NOTEBOOKS:
+        for tag, sql in find_tagged_cells(path):
+            if is_only_comments(sql):
+                continue
+            error = parse_error(spark, sql.strip())
+            if error:
+                diagnostics.append(CellDiagnostic(path, tag, sql, error))
+    return diagnostics
@@ -0,0 +1,199 @@
+"""Portable surrogate keys for the gold dimensions.
+
+On Databricks the dimension keys come from GENERATED ALWAYS AS IDENTITY,
+which hands out values one commit at a time; locally strip_identity()
+removes the clause and keys are left NULL or set by hand. This module keeps
+the keys in a key-map table instead:
+
+    gold.surrogate_keys (dimension, natural_key, surrogate_key, assigned_at)
+
+assign_keys() finds natural keys not yet in the map and numbers them
+without funnelling every row through one task:
+
+* "sequence" (default): the new keys are range-partitioned by natural key,
+  numbered with row_number() inside each partition, and offset by the
+  current maximum key plus the row counts of the partitions before them.
+  The result is max + rank in natural-key order — the same on every run and
+  every runtime, however the data is partitioned.
+* "hash": the key is xxhash64(natural_key) with the sign bit cleared, so it
+  needs no offset at all; collisions are checked and raise ValueError.
+
+Use one method per dimension. Keys already in the map never change.
+seed_from_dimension() imports keys a dimension already has (e.g. assigned
+by IDENTITY), apply_keys() writes the mapped keys into a dimension whose key
+column is a plain BIGINT, and key_lookup() gives fact loads a subquery to
+join on instead of the dimension table.
+"""
+
+from collections import namedtuple
+
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+KEY_MAP_TABLE = "gold.surrogate_keys"
+
+Dimension = namedtuple("Dimension", ["name", "table", "key", "natural_key", "source"])
+
+DIMENSIONS = {
+    "customer": Dimension(
+        "customer", "gold.dim_customer", "customer_id", "email",
+        "SELECT email FROM silver.customers UNION SELECT 'in-store' AS email",
+    ),
+    "store": Dimension(
+        "store", "gold.dim_store", "store_id", "store_nbr",
+        "SELECT store_nbr FROM silver.stores UNION SELECT 'online' AS store_nbr",
+    ),
+    "book": Dimension(
+        "book", "gold.dim_book", "book_id", "isbn",
+        "SELECT isbn FROM silver.books",
+    ),
+}
+
+_POSITIVE_BIGINT = 0x7FFFFFFFFFFFFFFF
+
+
+def create_key_map(spark):
+    spark.sql(f"""
+        CREATE TABLE IF NOT EXISTS {KEY_MAP_TABLE} (
+            dimension STRING,
+            natural_key STRING,
+            surrogate_key BIGINT,
+            assigned_at TIMESTAMP
+        ) USING DELTA
+        PARTITIONED BY (dimension)
+    """)
+
+
+def key_lookup(dimension):
+    """Return a subquery mapping the dimension's natural key to its surrogate key.
+
+    Columns are named after the dimension's own columns, e.g. for "customer":
+    (email, customer_id).
+    """
+    dim = DIMENSIONS[dimension]
+    return (
+        f"(SELECT natural_key AS {dim.natural_key}, surrogate_key AS {dim.key} "
+        f"FROM {KEY_MAP_TABLE} WHERE dimension = '{dim.name}')"
+    )
+
+
+def seed_from_dimension(spark, dimension):
+    """Add the keys already present in the dimension table to the key map."""
+    dim = DIMENSIONS[dimension]
+    create_key_map(spark)
+    return _insert_keys(spark, dim, spark.sql(f"""
+        SELECT CAST({dim.natural_key} AS STRING) AS natural_key, {dim.key} AS surrogate_key
+        FROM {dim.table}
+        WHERE {dim.key} IS NOT NULL AND {dim.natural_key} IS NOT NULL
+    """))
+
+
+def assign_keys(spark, dimension, source=None, method="sequence"):
+    """Give every new natural key in `source` a surrogate key; returns how many.
+
+    `source` is a query with a column named after the dimension's natural key
+    (default: the dimension's silver source).
+    """
+    dim = DIMENSIONS[dimension]
+    create_key_map(spark)
+    new = spark.sql(f"""
+        SELECT DISTINCT CAST(src.{dim.natural_key} AS STRING) AS natural_key
+        FROM ({source or dim.source}) src
+        LEFT ANTI JOIN {KEY_MAP_TABLE} km
+          ON km.dimension = '{dim.name}'
+         AND km.natural_key = CAST(src.{dim.natural_key} AS STRING)
+        WHERE src.{dim.natural_key} IS NOT NULL
+    """)
+    if method == "sequence":
+        return _assign_sequence(spark, dim, new)
+    if method == "hash":
+        return _assign_hash(spark, dim, new)
+    raise ValueError(f"Unknown key assignment method: {method}")
+
+
+def apply_keys(spark, dimension):
+    """Set the dimension's key column from the key map where it differs.
+
+    For dimensions whose key is a plain BIGINT (locally, after
+    strip_identity()); an IDENTITY column cannot be updated.
+    """
+    dim = DIMENSIONS[dimension]
+    row = spark.sql(f"""
+        MERGE INTO {dim.table} t
+        USING {key_lookup(dimension)} k
+        ON t.{dim.natural_key} = k.{dim.natural_key}
+        WHEN MATCHED AND (t.{dim.key} IS NULL OR t.{dim.key} <> k.{dim.key})
+          THEN UPDATE SET t.{dim.key} = k.{dim.key}
+    """).first()
+    return row.num_updated_rows
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _assign_sequence(spark, dim, new):
+    offset = spark.sql(f"""
+        SELECT COALESCE(MAX(surrogate_key), 0) FROM {KEY_MAP_TABLE}
+        WHERE dimension = '{dim.name}'
+    """).first()[0]
+    # Persisted so the row counts and the numbering see the same partitions
+    ranged = (
+        new.repartitionByRange("natural_key")
+        .withColumn("part", F.spark_partition_id())
+        .persist()
+    )
+    try:
+        counts = dict(ranged.groupBy("part").count().collect())
+        bases = []
+        for part in sorted(counts):
+            bases.append((part, offset))
+            offset += counts[part]
+        keyed = (
+            ranged
+            .withColumn("rn", F.row_number().over(Window.partitionBy("part").orderBy("natural_key")))
+            .join(F.broadcast(spark.createDataFrame(bases, "part INT, base BIGINT")), "part")
+            .select("natural_key", (F.col("base") + F.col("rn")).alias("surrogate_key"))
+        )
+        return _insert_keys(spark, dim, keyed)
+    finally:
+        ranged.unpersist()
+
+
+def _assign_hash(spark, dim, new):
+    keyed = new.select(
+        "natural_key",
+        F.xxhash64("natural_key").bitwiseAND(F.lit(_POSITIVE_BIGINT)).alias("surrogate_key"),
+    )
+    existing = spark.table(KEY_MAP_TABLE).where(F.col("dimension") == dim.name)
+    clashes = (
+        keyed.unionByName(existing.select("natural_key", "surrogate_key"))
+        .groupBy("surrogate_key")
+        .agg(F.collect_set("natural_key").alias("natural_keys"))
+        .where(F.size("natural_keys") > 1)
+        .limit(5)
+        .collect()
+    )
+    if clashes:
+        raise ValueError(
+            f"Hash key collision in {dim.name}: "
+            + ", ".join(str(sorted(c.natural_keys)) for c in clashes)
+        )
+    return _insert_keys(spark, dim, keyed)
+
+
+def _insert_keys(spark, dim, keyed):
+    """Insert-only MERGE, so a key already in the map is never reassigned."""
+    keyed.createOrReplaceTempView("_surrogate_keys_new")
+    row = spark.sql(f"""
+        MERGE INTO {KEY_MAP_TABLE} t
+        USING (
+            SELECT '{dim.name}' AS dimension, natural_key, surrogate_key,
+                   current_timestamp() AS assigned_at
+            FROM _surrogate_keys_new
+        ) s
+        ON t.dimension = s.dimension AND t.natural_key = s.natural_key
+        WHEN NOT MATCHED THEN INSERT *
+    """).first()
+    spark.catalog.dropTempView("_surrogate_keys_new")
+    return row.num_inserted_rows
@@ -0,0 +1,71 @@
+"""Tests for Delta log row counts and per-version key stats."""
+
+from tests.delta_metadata import BRONZE_KEYS, DeltaMetadata, verify_load
+
+
+def _insert_stores(spark, *store_nbrs):
+    values = ", ".join(
+        f"('{nbr}', 'Store {nbr}', '1 Main St', 'Springfield', 'IL', '62701', "
+        f"current_timestamp(), 'stores.csv')"
+        for nbr in store_nbrs
+    )
+    spark.sql(f"INSERT INTO bronze.stores VALUES {values}")
+
+
+# ---------------------------------------------------------------------------
+# Tests — log summaries
+# ---------------------------------------------------------------------------
+
+def test_row_counts_match_count_star(spark):
+    _insert_stores(spark, "S001", "S002")
+    _insert_stores(spark, "S003")
+    meta = DeltaMetadata(spark)
+
+    summary = meta.summary("bronze.stores")
+    assert summary.from_log
+    assert summary.num_rows == 3
+    # file count depends on the writer's partitioning, so take Delta's own
+    assert summary.num_files == spark.sql("DESCRIBE DETAIL bronze.stores").first().numFiles
+    assert summary.size_bytes > 0
+    assert meta.row_counts(BRONZE_KEYS) == {
+        table: spark.table(table).count() for table in BRONZE_KEYS
+    }
+
+
+def test_summary_cached_until_table_changes(spark):
+    _insert_stores(spark, "S001")
+    meta = DeltaMetadata(spark)
+    first = meta.summary("bronze.stores")
+    assert meta.summary("bronze.stores") is first
+    assert (meta.hits, meta.misses) == (1, 1)
+
+    spark.sql("DELETE FROM bronze.stores WHERE store_nbr = 'S001'")
+    second = meta.summary("bronze.stores")
+    assert second.version > first.version
+    assert second.num_rows == 0
+
+
+# ---------------------------------------------------------------------------
+# Tests — key stats
+# ---------------------------------------------------------------------------
+
+def test_key_stats_count_duplicates_and_nulls(spark):
+    _insert_stores(spark, "S001", "S001", "S002")
+    spark.sql("INSERT INTO bronze.stores (store_nbr) VALUES (NULL)")
+    stats = DeltaMetadata(spark).key_stats("bronze.stores", ["store_nbr"])
+    assert (stats.num_rows, stats.distinct_keys, stats.duplicate_keys, stats.null_keys) == (4, 2, 1, 1)
+
+
+def test_verify_load_scans_each_version_once(spark):
+    _insert_stores(spark, "S001", "S002")
+    meta = DeltaMetadata(spark)
+    report = verify_load(meta, BRONZE_KEYS)
+    assert report["bronze.stores"].duplicate_keys == 0
+    assert report["bronze.books"].num_rows == 0
+
+    misses = meta.misses
+    assert verify_load(meta, BRONZE_KEYS) == report
+    assert meta.misses == misses
+
+    _insert_stores(spark, "S002")
+    assert verify_load(meta, BRONZE_KEYS)["bronze.stores"].duplicate_keys == 1
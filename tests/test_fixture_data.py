@@ -0,0 +1,56 @@
+"""Tests for the declarative fixture data loader."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from tests.fixture_data import NOW, load_tables
+
+
+def test_one_commit_per_table(spark):
+    before = _version(spark, "silver.order_items")
+    load_tables(spark, {
+        "silver.order_items": [
+            ("ONL-001", "online",   "978-0-00-000001-1", 2, Decimal("19.99")),
+            ("INS-001", "in-store", "978-0-00-000001-1", 1, Decimal("19.99")),
+            ("INS-002", "in-store", "978-0-00-000002-2", 1, Decimal("24.99")),
+        ],
+    })
+    assert _version(spark, "silver.order_items") == before + 1
+    assert spark.table("silver.order_items").count() == 3
+
+
+def test_now_becomes_load_time(spark):
+    start = datetime.now()
+    load_tables(spark, {
+        "bronze.stores": [
+            ("S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701", NOW, "stores.csv"),
+        ],
+    })
+    row = spark.table("bronze.stores").collect()[0]
+    assert row.ingestion_timestamp >= start.replace(microsecond=0)
+
+
+def test_column_subset_fills_nulls(spark):
+    load_tables(spark, {
+        "gold.dim_store": (["store_id", "store_nbr", "name"], [(2, "online", "Online")]),
+    })
+    row = spark.table("gold.dim_store").collect()[0]
+    assert row.store_id == 2
+    assert row.address is None
+
+
+def test_empty_tables_skipped(spark):
+    before = _version(spark, "silver.stores")
+    load_tables(spark, {"silver.stores": []})
+    assert _version(spark, "silver.stores") == before
+
+
+def test_unknown_column_rejected(spark):
+    with pytest.raises(ValueError, match="colour"):
+        load_tables(spark, {"silver.stores": (["store_nbr", "colour"], [("S001", "red")])})
+
+
+def _version(spark, table):
+    return spark.sql(f"DESCRIBE HISTORY {table} LIMIT 1").collect()[0].version
@@ -0,0 +1,174 @@
+"""Tests for the pre-aggregated gold sales summary tables."""
+
+from decimal import Decimal
+
+import pytest
+
+from tests.delta_tables import table_version
+from tests.gold_aggregates import (
+    DAILY_SALES,
+    MONTHLY_SALES,
+    choose_aggregate,
+    refresh_aggregates,
+    rollup_sql,
+)
+from tests.medallion_data import GOLD_DIMS
+
+
+# ---------------------------------------------------------------------------
+# Tests — aggregate maintenance
+# ---------------------------------------------------------------------------
+
+def test_full_build_matches_fact(spark):
+    refresh_aggregates(spark)
+    daily = spark.sql("SELECT SUM(total_sales) AS s, SUM(line_items) AS n FROM gold.agg_daily_sales").collect()[0]
+    monthly = spark.sql("SELECT SUM(total_sales) AS s, SUM(line_items) AS n FROM gold.agg_monthly_sales").collect()[0]
+    fact = spark.sql("SELECT SUM(line_total) AS s, COUNT(*) AS n FROM gold.fact_sales").collect()[0]
+    assert daily.s == monthly.s == fact.s
+    assert daily.n == monthly.n == fact.n
+
+
+def test_incremental_refresh_only_touches_changed_dates(spark):
+    refresh_aggregates(spark)
+    spark.sql("""
+        INSERT INTO gold.fact_sales (sales_id, customer_id, book_id, date_id, store_id,
+            order_id, order_channel, isbn, quantity, unit_price, line_total, payment_method)
+        VALUES
+        (6, 2, 2, 20250616, 1, 'INS-003', 'in-store', '978-0-00-000002-2',
+         2, CAST(24.99 AS DECIMAL(10,2)), CAST(49.98 AS DECIMAL(10,2)), 'cash')
+    """)
+    refreshed = refresh_aggregates(spark)
+    assert refreshed[DAILY_SALES.table] == 1
+    assert refreshed[MONTHLY_SALES.table] == 1
+
+    row = spark.sql("""
+        SELECT * FROM gold.agg_daily_sales
+        WHERE date_id = 20250616 AND store_id = 1 AND book_id = 2
+    """).collect()
+    assert len(row) == 1
+    assert row[0].total_sales == Decimal("74.97")
+    assert row[0].total_units == 3
+
+
+def test_incremental_refresh_removes_deleted_groups(spark):
+    refresh_aggregates(spark)
+    spark.sql("DELETE FROM gold.fact_sales WHERE order_id = 'INS-002'")
+    refresh_aggregates(spark)
+    rows = spark.sql("SELECT * FROM gold.agg_daily_sales WHERE date_id = 20250616").collect()
+    assert rows == []
+
+
+def test_refresh_without_changes_is_noop(spark):
+    refresh_aggregates(spark)
+    before = {t: table_version(spark, t) for t in (DAILY_SALES.table, MONTHLY_SALES.table)}
+    refreshed = refresh_aggregates(spark)
+    assert refreshed == {DAILY_SALES.table: 0, MONTHLY_SALES.table: 0}
+    # No data rewrite and no version-property commit either
+    assert {t: table_version(spark, t) for t in before} == before
+
+
+def test_monthly_refresh_keeps_categories_apart(spark):
+    # Same genre, month and channel, different category: two monthly groups
+    spark.sql("UPDATE gold.dim_book SET category = 'Nonfiction' WHERE book_id = 2")
+    refresh_aggregates(spark)
+    spark.sql("""
+        INSERT INTO gold.fact_sales (sales_id, customer_id, book_id, date_id, store_id,
+            order_id, order_channel, isbn, quantity, unit_price, line_total, payment_method)
+        VALUES
+        (6, 2, 2, 20250616, 1, 'INS-003', 'in-store', '978-0-00-000002-2',
+         2, CAST(24.99 AS DECIMAL(10,2)), CAST(49.98 AS DECIMAL(10,2)), 'cash')
+    """)
+    refresh_aggregates(spark)
+    rows = spark.sql("""
+        SELECT category, total_units FROM gold.agg_monthly_sales
+        WHERE yearmo = 202506 AND order_channel = 'in-store'
+    """).collect()
+    assert sorted((r.category, r.total_units) for r in rows) == [("Fiction", 4), ("Nonfiction", 3)]
+
+
+def test_dimension_change_refreshes_monthly_rows(spark):
+    refresh_aggregates(spark)
+    spark.sql("UPDATE gold.dim_book SET category = 'Nonfiction' WHERE book_id = 2")
+    refreshed = refresh_aggregates(spark)
+    # Daily rows only hold book_id; monthly rows copy the category
+    assert refreshed == {DAILY_SALES.table: 0, MONTHLY_SALES.table: 1}
+    rows = spark.sql("""
+        SELECT category, total_units FROM gold.agg_monthly_sales
+        WHERE yearmo = 202506 AND order_channel = 'in-store'
+    """).collect()
+    assert sorted((r.category, r.total_units) for r in rows) == [("Fiction", 4), ("Nonfiction", 1)]
+
+
+# ---------------------------------------------------------------------------
+# Tests — rollup query rewriting
+# ---------------------------------------------------------------------------
+
+def test_choose_aggregate_picks_smallest():
+    assert choose_aggregate(["d.year", "d.quarter", "f.order_channel"]) is MONTHLY_SALES
+    assert choose_aggregate(["b.category", "d.month"]) is MONTHLY_SALES
+    assert choose_aggregate(["s.name", "d.year", "d.month"]) is DAILY_SALES
+    assert choose_aggregate(["c.email"]) is None
+
+
+def test_rollup_sql_routes_to_aggregate():
+    sql = rollup_sql(["s.name", "d.year"], measures=["total_sales", "line_items"])
+    assert "FROM gold.agg_daily_sales a" in sql
+    assert "JOIN gold.dim_store s ON a.store_id = s.store_id" in sql
+    assert "SUM(a.line_items) AS line_items" in sql
+
+
+def test_rollup_results_match_fact(spark):
+    refresh_aggregates(spark)
+    for group_by in (["b.category", "b.genre"], ["s.name", "d.year", "d.month"], ["c.email"]):
+        routed = spark.sql(rollup_sql(group_by, ["total_sales", "total_units"]))
+        direct = spark.sql(_fact_rollup(group_by))
+        assert sorted(routed.collect()) == sorted(direct.collect())
+
+
+def test_rollup_sql_rejects_unknown_measure():
+    with pytest.raises(ValueError):
+        rollup_sql(["d.year"], measures=["avg_price"])
+
+
+# ===========================================================================
+# Helpers and fixtures
+# ===========================================================================
+
+def _fact_rollup(group_by):
+    joins = {
+        "d": "JOIN gold.dim_date d ON f.date_id = d.date_id",
+        "b": "JOIN gold.dim_book b ON f.book_id = b.book_id",
+        "s": "JOIN gold.dim_store s ON f.store_id = s.store_id",
+        "c": "JOIN gold.dim_customer c ON f.customer_id = c.customer_id",
+    }
+    aliases = sorted({attr.split(".")[0] for attr in group_by})
+    cols = ", ".join(group_by)
+    return f"""
+        SELECT {cols}, SUM(f.line_total) AS total_sales, SUM(f.quantity) AS total_units
+        FROM gold.fact_sales f {' '.join(joins[a] for a in aliases)}
+        GROUP BY {cols}
+    """
+
+
+_FACT_SALES = (
+    ["sales_id", "customer_id", "book_id", "date_id", "store_id", "order_id",
+     "order_channel", "isbn", "quantity", "unit_price", "line_total", "payment_method"],
+    [
+        (1, 1, 1, 20250615, 2, "ONL-001", "online", "978-0-00-000001-1",
+         2, Decimal("19.99"), Decimal("39.98"), "credit_card"),
+        (2, 2, 2, 20250615, 2, "ONL-002", "online", "978-0-00-000002-2",
+         1, Decimal("24.99"), Decimal("24.99"), "debit_card"),
+        (3, 3, 1, 20250615, 1, "INS-001", "in-store", "978-0-00-000001-1",
+         1, Decimal("19.99"), Decimal("19.99"), "cash"),
+        (4, 2, 1, 20250616, 1, "INS-002", "in-store", "978-0-00-000001-1",
+         3, Decimal("19.99"), Decimal("59.97"), "credit_card"),
+        (5, 2, 2, 20250616, 1, "INS-002", "in-store", "978-0-00-000002-2",
+         1, Decimal("24.99"), Decimal("24.99"), "credit_card"),
+    ],
+)
+
+
+@pytest.fixture(autouse=True)
+def gold_star_populated(spark, layer_snapshots):
+    """Populate the gold dimensions and fact_sales for aggregate tests."""
+    layer_snapshots.restore("gold_star_loaded", {**GOLD_DIMS, "gold.fact_sales": _FACT_SALES})
@@ -0,0 +1,123 @@
+"""Tests for watermark-based late-arriving order handling."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from tests.fixture_data import NOW, load_tables
+from tests.late_data import RUNS_TABLE, refresh_customers, refresh_fact_sales
+from tests.medallion_data import BRONZE_DATA, GOLD_DIMS, SILVER_DATA
+
+_ONLINE_ORDERS = {"bronze.online_orders": BRONZE_DATA["bronze.online_orders"]}
+
+
+def _online_order(order_id, when, email, name):
+    return (order_id, when, email, name, "1 Late Ln", "LateCity", "IL", "60003",
+            "[]", "credit_card", Decimal("10.00"), NOW, "online_orders_late.csv")
+
+
+def _customer(spark, email):
+    return spark.sql(f"SELECT * FROM silver.customers WHERE email = '{email}'").first()
+
+
+# ---------------------------------------------------------------------------
+# Tests — silver.customers
+# ---------------------------------------------------------------------------
+
+def test_first_run_builds_all_customers(spark):
+    load_tables(spark, _ONLINE_ORDERS)
+    run = refresh_customers(spark)
+    assert (run.new_rows, run.late_rows, run.affected_keys) == (2, 0, 1)
+    assert run.event_watermark == datetime(2025, 7, 15, 14, 0, 0)
+    assert _customer(spark, "alice@example.com").name == "Alice New"
+
+
+def test_late_order_does_not_overwrite_newer_fields(spark):
+    load_tables(spark, _ONLINE_ORDERS)
+    refresh_customers(spark)
+
+    load_tables(spark, {"bronze.online_orders": [
+        _online_order("ONL-003", datetime(2025, 6, 20, 9, 0, 0), "alice@example.com", "Alice Late"),
+    ]})
+    run = refresh_customers(spark)
+    assert (run.new_rows, run.late_rows, run.affected_keys) == (1, 1, 1)
+    assert (run.late_from, run.late_to) == (date(2025, 6, 20), date(2025, 6, 20))
+    assert run.event_watermark == datetime(2025, 7, 15, 14, 0, 0)
+    assert _customer(spark, "alice@example.com").name == "Alice New"
+
+
+def test_on_time_order_only_touches_its_customer(spark):
+    load_tables(spark, _ONLINE_ORDERS)
+    refresh_customers(spark)
+
+    load_tables(spark, {"bronze.online_orders": [
+        _online_order("ONL-004", datetime(2025, 8, 1, 9, 0, 0), "bob@example.com", "Bob Jones"),
+    ]})
+    run = refresh_customers(spark)
+    assert (run.late_rows, run.affected_keys) == (0, 1)
+    assert run.event_watermark == datetime(2025, 8, 1, 9, 0, 0)
+    assert _customer(spark, "bob@example.com").name == "Bob Jones"
+
+
+def test_run_without_new_rows_is_a_no_op(spark):
+    load_tables(spark, _ONLINE_ORDERS)
+    refresh_customers(spark)
+    run = refresh_customers(spark)
+    assert (run.new_rows, run.late_rows, run.affected_keys) == (0, 0, 0)
+    assert spark.table(RUNS_TABLE).where("pipeline = 'silver.customers'").count() == 2
+
+
+# ---------------------------------------------------------------------------
+# Tests — gold.fact_sales
+# ---------------------------------------------------------------------------
+
+def test_late_order_lands_on_its_own_date(spark):
+    load_tables(spark, {**SILVER_DATA, **GOLD_DIMS})
+    first = refresh_fact_sales(spark)
+    assert first.late_rows == 0
+    assert spark.table("gold.fact_sales").count() == 5
+
+    load_tables(spark, {
+        "silver.orders": [
+            ("ONL-003", "online", datetime(2025, 6, 15, 18, 0, 0),
+             "alice@example.com", "online", "credit_card", Decimal("24.99"), None),
+        ],
+        "silver.order_items": [
+            ("ONL-003", "online", "978-0-00-000002-2", 1, Decimal("24.99")),
+        ],
+    })
+    run = refresh_fact_sales(spark)
+    # The order and its one line item are a single late order
+    assert (run.new_rows, run.late_rows, run.affected_keys) == (1, 1, 1)
+    assert run.late_from == date(2025, 6, 15)
+
+    row = spark.sql("SELECT * FROM gold.fact_sales WHERE order_id = 'ONL-003'").first()
+    assert (row.date_id, row.customer_id, row.store_id) == (20250615, 1, 2)
+    assert spark.table("gold.fact_sales").count() == 6
+
+
+def test_removed_line_item_leaves_fact_sales(spark):
+    load_tables(spark, {**SILVER_DATA, **GOLD_DIMS})
+    refresh_fact_sales(spark)
+
+    spark.sql("""
+        DELETE FROM silver.order_items
+        WHERE order_id = 'INS-002' AND isbn = '978-0-00-000002-2'
+    """)
+    run = refresh_fact_sales(spark)
+    assert run.affected_keys == 1
+
+    lines = spark.sql("SELECT isbn FROM gold.fact_sales WHERE order_id = 'INS-002'").collect()
+    assert [r.isbn for r in lines] == ["978-0-00-000001-1"]
+    assert spark.table("gold.fact_sales").count() == 4
+
+
+def test_first_run_rebuilds_fact_sales(spark):
+    load_tables(spark, {**SILVER_DATA, **GOLD_DIMS})
+    spark.sql("""
+        INSERT INTO gold.fact_sales (order_id, order_channel, isbn, quantity)
+        VALUES ('GONE-001', 'online', '978-0-00-000001-1', 1)
+    """)
+    run = refresh_fact_sales(spark)
+    assert run.affected_keys == 4
+    assert spark.table("gold.fact_sales").where("order_id = 'GONE-001'").count() == 0
+    assert spark.table("gold.fact_sales").count() == 5
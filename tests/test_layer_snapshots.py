@@ -0,0 +1,51 @@
+"""Tests for shallow-clone layer snapshots."""
+
+import pytest
+
+from tests.layer_snapshots import LayerSnapshots
+
+_STORES = {
+    "silver.stores": [
+        ("S001", "Downtown Books", "100 Main St", "Springfield", "IL", "62701"),
+        ("S002", "Airport Books", "200 Terminal Dr", "Springfield", "IL", "62702"),
+    ],
+}
+
+
+@pytest.fixture()
+def snapshots(spark):
+    # Own schema, so the session-wide snapshots are left alone
+    snapshots = LayerSnapshots(spark, schema="test_layer_snapshots")
+    yield snapshots
+    snapshots.drop_all()
+
+
+def test_restore_populates_live_table_by_clone(spark, snapshots):
+    snapshots.restore("stores_loaded", _STORES)
+    assert spark.table("silver.stores").count() == 2
+    last = spark.sql("DESCRIBE HISTORY silver.stores LIMIT 1").collect()[0]
+    assert "CLONE" in last.operation
+
+
+def test_writes_do_not_reach_snapshot(spark, snapshots):
+    snapshots.restore("stores_loaded", _STORES)
+    spark.sql("DELETE FROM silver.stores WHERE store_nbr = 'S001'")
+    spark.sql("INSERT INTO silver.stores VALUES ('S003', 'Mall Books', '1 Mall Rd', 'Springfield', 'IL', '62703')")
+
+    snapshots.restore("stores_loaded", _STORES)
+    stores = sorted(r.store_nbr for r in spark.table("silver.stores").collect())
+    assert stores == ["S001", "S002"]
+
+
+def test_snapshot_built_once(spark, snapshots):
+    snapshots.restore("stores_loaded", _STORES)
+    snapshots.restore("stores_loaded", _STORES)
+    snapshot = "test_layer_snapshots.stores_loaded__silver__stores"
+    writes = spark.sql(f"DESCRIBE HISTORY {snapshot}").filter("operation = 'WRITE'").count()
+    assert writes == 1
+
+
+def test_state_table_mismatch_rejected(snapshots):
+    snapshots.restore("stores_loaded", _STORES)
+    with pytest.raises(ValueError, match="stores_loaded"):
+        snapshots.restore("stores_loaded", {"silver.books": []})
@@ -0,0 +1,257 @@
+"""Tests for MERGE conflict retries, including a parallel-load stress test."""
+
+import threading
+from datetime import date
+
+import pytest
+
+from tests.merge_retry import (
+    RetryPolicy,
+    is_conflict,
+    merge_with_retry,
+    narrow_merge,
+    retrying_execute,
+    run_with_retry,
+)
+from tests.pipeline_runner import Step, run_pipeline
+
+
+class ConcurrentAppendException(Exception):
+    """Stands in for delta.exceptions.ConcurrentAppendException."""
+
+
+def _flaky(failures, exc=ConcurrentAppendException):
+    calls = []
+
+    def action():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc("Files were added to the root of the table by a concurrent update.")
+        return "done"
+
+    return action, calls
+
+
+_NO_WAIT = RetryPolicy(retries=3, base_delay=0.0, max_delay=0.0)
+
+
+# ---------------------------------------------------------------------------
+# Tests — retry policy
+# ---------------------------------------------------------------------------
+
+def test_is_conflict_by_class_or_error_class():
+    assert is_conflict(ConcurrentAppendException())
+    assert is_conflict(RuntimeError("[DELTA_CONCURRENT_DELETE_READ] ... was deleted"))
+    assert not is_conflict(ValueError("[PARSE_SYNTAX_ERROR]"))
+
+
+def test_conflicts_retried_until_success():
+    action, calls = _flaky(2)
+    delays = []
+    assert run_with_retry(action, _NO_WAIT, sleep=delays.append) == ("done", 3)
+    assert len(delays) == 2
+
+
+def test_gives_up_after_retries():
+    action, calls = _flaky(10)
+    with pytest.raises(ConcurrentAppendException):
+        run_with_retry(action, _NO_WAIT, sleep=lambda _: None)
+    assert len(calls) == 4
+
+
+def test_other_errors_not_retried():
+    action, calls = _flaky(1, exc=ValueError)
+    with pytest.raises(ValueError):
+        run_with_retry(action, _NO_WAIT, sleep=lambda _: None)
+    assert len(calls) == 1
+
+
+def test_retrying_execute_in_pipeline_runner(spark):
+    action, _ = _flaky(1)
+    attempts = {}
+    execute = retrying_execute(lambda session, step: action(), _NO_WAIT, attempts)
+    run_pipeline(spark, [Step("bronze_stores_load", "", set(), {"bronze.stores"})], execute=execute)
+    assert attempts == {"bronze_stores_load": 2}
+
+
+# ---------------------------------------------------------------------------
+# Tests — narrowing
+# ---------------------------------------------------------------------------
+
+def test_narrow_merge_bounds_source_and_target():
+    sql = narrow_merge(
+        "MERGE INTO gold.fact_sales AS t\n"
+        "USING (SELECT * FROM a JOIN b ON a.id = b.id) s\n"
+        "ON t.order_id = s.order_id\n"
+        "WHEN NOT MATCHED THEN INSERT *",
+        "date_id", 20250601, 20250630,
+    )
+    assert (
+        "USING (SELECT * FROM (SELECT * FROM a JOIN b ON a.id = b.id) "
+        "WHERE date_id BETWEEN 20250601 AND 20250630) s\n" in sql
+    )
+    assert "ON (t.order_id = s.order_id) AND t.date_id BETWEEN 20250601 AND 20250630\n" in sql
+
+
+def test_narrow_merge_without_alias_uses_names():
+    sql = narrow_merge(
+        "MERGE INTO bronze.online_orders USING batch "
+        "ON bronze.online_orders.order_id = batch.order_id WHEN NOT MATCHED THEN INSERT *",
+        "order_date", date(2025, 6, 1),
+    )
+    assert "USING (SELECT * FROM batch WHERE order_date = DATE'2025-06-01') batch" in sql
+    assert "AND bronze.online_orders.order_date = DATE'2025-06-01'" in sql
+
+
+def test_narrow_merge_skips_comments_and_quotes():
+    sql = narrow_merge(
+        "MERGE INTO silver.orders t -- don't narrow USING this\n"
+        "USING `batch ON x` AS s /* WHEN */\n"
+        "ON t.order_id = s.order_id AND s.note <> 'it''s WHEN' -- it's fine\n"
+        "WHEN MATCHED THEN UPDATE SET *",
+        "order_date", date(2025, 6, 1),
+    )
+    assert "USING (SELECT * FROM `batch ON x` WHERE order_date = DATE'2025-06-01') s\n" in sql
+    assert "ON (t.order_id = s.order_id AND s.note <> 'it''s WHEN') AND t.order_date" in sql
+
+
+def test_narrow_merge_needs_source_alias_for_qualified_source():
+    with pytest.raises(ValueError, match="alias"):
+        narrow_merge("MERGE INTO t USING bronze.x ON t.id = x.id WHEN MATCHED THEN DELETE", "d", 1)
+
+
+_PARTITIONED = "bronze.narrowed_orders"
+
+
+@pytest.fixture()
+def partitioned_orders(spark):
+    spark.sql(f"""
+        CREATE TABLE {_PARTITIONED} (order_id STRING, order_date DATE, amount INT)
+        USING DELTA PARTITIONED BY (order_date)
+    """)
+    spark.sql(f"""
+        INSERT INTO {_PARTITIONED} VALUES
+        ('A-1', DATE'2025-06-01', 1), ('B-1', DATE'2025-06-02', 1)
+    """)
+
+
+def _upsert(source):
+    return (
+        f"MERGE INTO {_PARTITIONED} t USING {source} s ON t.order_id = s.order_id "
+        "WHEN MATCHED THEN UPDATE SET t.amount = s.amount "
+        "WHEN NOT MATCHED THEN INSERT *"
+    )
+
+
+def test_narrowing_never_inserts_duplicates(spark, partitioned_orders):
+    # B-1 already exists, outside the range the MERGE is narrowed to
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW stray AS
+        SELECT * FROM VALUES ('B-1', DATE'2025-06-02', 2) AS v(order_id, order_date, amount)
+    """)
+    spark.sql(narrow_merge(_upsert("stray"), "order_date", date(2025, 6, 1))).collect()
+    rows = spark.sql(f"SELECT * FROM {_PARTITIONED} WHERE order_id = 'B-1'").collect()
+    assert [(r.order_date, r.amount) for r in rows] == [(date(2025, 6, 2), 1)]
+
+
+# ---------------------------------------------------------------------------
+# Tests — stress: parallel loads into the same bronze table
+# ---------------------------------------------------------------------------
+
+_WRITERS = 4
+_ORDERS_PER_WRITER = 5
+
+
+def _batch_view(spark, writer):
+    rows = ", ".join(
+        f"('W{writer}-{n:03d}', 'w{writer}@example.com', CAST({n}.00 AS DECIMAL(10,2)))"
+        for n in range(_ORDERS_PER_WRITER)
+    )
+    spark.sql(f"""
+        CREATE OR REPLACE TEMPORARY VIEW batch_{writer} AS
+        SELECT * FROM VALUES {rows} AS v(order_id, customer_email, total_amount)
+    """)
+
+
+def test_disjoint_narrowed_writers_do_not_conflict(spark, partitioned_orders):
+    days = {"A": date(2025, 6, 1), "B": date(2025, 6, 2)}
+    rounds = 3
+    for writer, day in days.items():
+        rows = ", ".join(
+            f"('{writer}-{n}', DATE'{day.isoformat()}', {n})" for n in range(1, 4)
+        )
+        spark.sql(f"""
+            CREATE OR REPLACE TEMPORARY VIEW batch_{writer} AS
+            SELECT * FROM VALUES {rows} AS v(order_id, order_date, amount)
+        """)
+
+    no_retries = RetryPolicy(retries=0, base_delay=0.0, max_delay=0.0)
+    errors = []
+    start = threading.Barrier(len(days))
+
+    def load(writer):
+        sql = narrow_merge(_upsert(f"batch_{writer}"), "order_date", days[writer])
+        start.wait()
+        try:
+            for _ in range(rounds):
+                merge_with_retry(spark, sql, no_retries)
+        except Exception as exc:  # surfaced in the main thread below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=load, args=(w,)) for w in days]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Without retries any conflict would have been raised
+    assert not errors, errors
+    counts = spark.sql(f"""
+        SELECT COUNT(*) AS n, COUNT(DISTINCT order_id) AS keys FROM {_PARTITIONED}
+    """).first()
+    assert (counts.n, counts.keys) == (6, 6)
+
+
+def test_parallel_merges_and_compaction_all_land(spark):
+    spark.sql("INSERT INTO bronze.online_orders (order_id) VALUES ('SEED-001')")
+    for writer in range(_WRITERS):
+        _batch_view(spark, writer)
+
+    policy = RetryPolicy(retries=10, base_delay=0.05, max_delay=1.0)
+    attempts = {}
+    errors = []
+    start = threading.Barrier(_WRITERS + 1)
+
+    def load(writer):
+        start.wait()
+        try:
+            _, attempts[writer] = merge_with_retry(spark, f"""
+                MERGE INTO bronze.online_orders t
+                USING batch_{writer} s
+                ON t.order_id = s.order_id
+                WHEN MATCHED THEN UPDATE SET t.total_amount = s.total_amount
+                WHEN NOT MATCHED THEN INSERT (order_id, customer_email, total_amount)
+                    VALUES (s.order_id, s.customer_email, s.total_amount)
+            """, policy)
+        except Exception as exc:  # surfaced in the main thread below
+            errors.append(exc)
+
+    def compact():
+        start.wait()
+        try:
+            _, attempts["optimize"] = merge_with_retry(
+                spark, "OPTIMIZE bronze.online_orders", policy
+            )
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=load, args=(w,)) for w in range(_WRITERS)]
+    threads.append(threading.Thread(target=compact))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors, errors
+    assert spark.table("bronze.online_orders").count() == 1 + _WRITERS * _ORDERS_PER_WRITER
+    assert set(attempts) == set(range(_WRITERS)) | {"optimize"}
@@ -0,0 +1,154 @@
+"""Tests for the notebook-to-pipeline compiler."""
+
+import pytest
+
+from tests.pipeline_compiler import compile_pipeline, format_report, run_compiled
+from tests.pipeline_runner import Step, table_references
+
+
+def _step(name, sql):
+    reads, writes = table_references(sql)
+    return Step(name, sql, reads, writes)
+
+
+_STEPS = [
+    _step("silver_orders_unified_view",
+          "CREATE OR REPLACE TEMPORARY VIEW orders_unified AS "
+          "SELECT order_id, customer_email FROM bronze.online_orders "
+          "UNION ALL SELECT order_id, customer_email FROM bronze.instore_orders"),
+    _step("silver_orders_merge",
+          "MERGE INTO silver.orders t USING orders_unified s ON t.order_id = s.order_id "
+          "WHEN MATCHED THEN UPDATE SET t.customer_email = s.customer_email "
+          "WHEN NOT MATCHED THEN INSERT (order_id, customer_email) VALUES (s.order_id, s.customer_email)"),
+    _step("silver_order_ids_view",
+          "CREATE OR REPLACE TEMPORARY VIEW order_ids AS SELECT DISTINCT order_id FROM orders_unified"),
+    _step("silver_order_ids_count",
+          "SELECT COUNT(*) FROM order_ids"),
+    _step("silver_stores_merge",
+          "MERGE INTO silver.stores t USING bronze.stores s ON t.store_nbr = s.store_nbr "
+          "WHEN NOT MATCHED THEN INSERT (store_nbr, name) VALUES (s.store_nbr, s.name)"),
+    _step("gold_dim_store_merge",
+          "MERGE INTO gold.dim_store t USING silver.stores s ON t.store_nbr = s.store_nbr "
+          "WHEN NOT MATCHED THEN INSERT (store_nbr) VALUES (s.store_nbr)"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Tests — compilation
+# ---------------------------------------------------------------------------
+
+def test_shared_view_is_persisted():
+    pipeline = compile_pipeline(_STEPS)
+    # MERGE with WHEN MATCHED reads the view twice, the chained view once more
+    assert pipeline.evaluations["orders_unified"] == (3, 1)
+    assert pipeline.persisted == ["silver_orders_unified_view"]
+
+
+def test_single_use_view_is_not_persisted():
+    pipeline = compile_pipeline(_STEPS)
+    assert pipeline.evaluations["order_ids"] == (1, 1)
+    assert "silver_order_ids_view" not in pipeline.persisted
+
+
+def test_insert_only_merge_reads_source_once():
+    steps = [
+        _step("v", "CREATE OR REPLACE TEMPORARY VIEW v AS SELECT * FROM bronze.stores"),
+        _step("m", "MERGE INTO silver.stores t USING v s ON t.store_nbr = s.store_nbr "
+                   "WHEN NOT MATCHED THEN INSERT *"),
+    ]
+    assert compile_pipeline(steps).persisted == []
+
+
+def test_views_take_layer_of_first_consumer():
+    layers = compile_pipeline(_STEPS).layers
+    assert layers["silver_orders_unified_view"] == "silver"
+    assert layers["gold_dim_store_merge"] == "gold"
+
+
+def test_view_on_view_inherits_defining_layer():
+    layers = compile_pipeline(_STEPS).layers
+    # Only read by a plain SELECT; both take the layer of orders_unified
+    assert layers["silver_order_ids_view"] == "silver"
+    assert layers["silver_order_ids_count"] == "silver"
+
+
+def test_format_report_totals():
+    report = format_report(compile_pipeline(_STEPS))
+    assert report.splitlines()[-1].split() == ["total", "4", "2"]
+
+
+# ---------------------------------------------------------------------------
+# Tests — execution
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def bronze_orders(spark):
+    spark.sql("INSERT INTO bronze.stores (store_nbr, name) VALUES ('S001', 'Downtown Books')")
+    spark.sql("INSERT INTO bronze.online_orders (order_id, customer_email) VALUES ('ONL-001', 'a@example.com')")
+    spark.sql("INSERT INTO bronze.instore_orders (order_id, customer_email) VALUES ('INS-001', 'b@example.com')")
+
+
+def test_run_compiled_caches_then_releases_views(spark, bronze_orders):
+    cached_during = {}
+
+    def execute(session, step):
+        session.sql(step.sql).collect()
+        cached_during[step.name] = session.catalog.isCached("orders_unified")
+
+    run = run_compiled(spark, compile_pipeline(_STEPS), layer="silver", execute=execute)
+    assert run.steps == [
+        "silver_orders_unified_view", "silver_orders_merge", "silver_order_ids_view",
+        "silver_order_ids_count", "silver_stores_merge",
+    ]
+    assert run.persisted == ["orders_unified"]
+    # order_ids is a lazy view over orders_unified: still cached when it is read
+    assert cached_during["silver_orders_merge"]
+    assert cached_during["silver_order_ids_count"]
+    assert not cached_during["silver_stores_merge"]
+    assert not spark.catalog.isCached("orders_unified")
+    assert run.evaluations_saved == 2
+    assert run.jobs > 0 and run.tasks >= run.jobs
+    assert spark.table("silver.orders").count() == 2
+
+
+def test_run_counts_only_its_own_layers_savings(spark, bronze_orders):
+    steps = [
+        _step("silver_stores_view",
+              "CREATE OR REPLACE TEMPORARY VIEW stores_v AS SELECT store_nbr, name FROM bronze.stores"),
+        _step("silver_stores_merge",
+              "MERGE INTO silver.stores t USING stores_v s ON t.store_nbr = s.store_nbr "
+              "WHEN MATCHED THEN UPDATE SET t.name = s.name "
+              "WHEN NOT MATCHED THEN INSERT (store_nbr, name) VALUES (s.store_nbr, s.name)"),
+        _step("gold_dim_store_merge",
+              "MERGE INTO gold.dim_store t USING stores_v s ON t.store_nbr = s.store_nbr "
+              "WHEN NOT MATCHED THEN INSERT (store_nbr) VALUES (s.store_nbr)"),
+    ]
+    pipeline = compile_pipeline(steps)
+    assert pipeline.evaluations["stores_v"] == (3, 1)
+    # The gold MERGE's read is not part of a silver run
+    assert run_compiled(spark, pipeline, layer="silver").evaluations_saved == 1
+
+
+def test_run_compiled_restores_callers_job_group(spark, bronze_orders):
+    sc = spark.sparkContext
+    sc.setJobGroup("caller", "outer job group")
+    try:
+        run_compiled(spark, compile_pipeline(_STEPS), layer="gold")
+        assert sc.getLocalProperty("spark.jobGroup.id") == "caller"
+        assert sc.getLocalProperty("spark.job.description") == "outer job group"
+        assert sc.getLocalProperty("spark.job.interruptOnCancel") == "false"
+    finally:
+        sc.setLocalProperty("spark.jobGroup.id", None)
+        sc.setLocalProperty("spark.job.description", None)
+        sc.setLocalProperty("spark.job.interruptOnCancel", None)
+
+
+def test_run_compiled_uncaches_on_failure(spark, bronze_orders):
+    def execute(session, step):
+        if step.name == "silver_orders_merge":
+            raise RuntimeError("boom")
+        session.sql(step.sql)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_compiled(spark, compile_pipeline(_STEPS), execute=execute)
+    assert not spark.catalog.isCached("orders_unified")
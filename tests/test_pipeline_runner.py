@@ -0,0 +1,134 @@
+"""Tests for the dependency-aware medallion pipeline runner."""
+
+import threading
+import time
+
+import pytest
+
+from tests.pipeline_runner import (
+    Step,
+    build_graph,
+    critical_path,
+    run_pipeline,
+    table_references,
+)
+
+
+def _step(name, sql):
+    reads, writes = table_references(sql)
+    return Step(name, sql, reads, writes)
+
+
+_SILVER_STEPS = [
+    _step("silver_stores_merge",
+          "MERGE INTO silver.stores t USING bronze.stores s ON t.store_nbr = s.store_nbr "
+          "WHEN NOT MATCHED THEN INSERT *"),
+    _step("silver_categories_merge",
+          "MERGE INTO silver.categories t USING bronze.categories s "
+          "ON t.category_id = s.category_id WHEN NOT MATCHED THEN INSERT *"),
+    _step("silver_orders_unified_view",
+          "CREATE OR REPLACE TEMPORARY VIEW orders_unified AS "
+          "SELECT order_id FROM bronze.online_orders "
+          "UNION ALL SELECT order_id FROM bronze.instore_orders"),
+    _step("silver_orders_merge",
+          "MERGE INTO silver.orders t USING orders_unified s ON t.order_id = s.order_id "
+          "WHEN NOT MATCHED THEN INSERT *"),
+    _step("gold_dim_store_merge",
+          "MERGE INTO gold.dim_store t USING silver.stores s ON t.store_nbr = s.store_nbr "
+          "WHEN NOT MATCHED THEN INSERT (store_nbr) VALUES (s.store_nbr)"),
+    _step("gold_dim_store_sentinel",
+          "MERGE INTO gold.dim_store t USING (SELECT 'online' AS store_nbr) s "
+          "ON t.store_nbr = s.store_nbr WHEN NOT MATCHED THEN INSERT (store_nbr) VALUES (s.store_nbr)"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Tests — dependency discovery
+# ---------------------------------------------------------------------------
+
+def test_table_references_ignores_functions_and_formats():
+    reads, writes = table_references("""
+        -- @test:bronze_stores_raw
+        CREATE OR REPLACE TEMPORARY VIEW stores_raw AS
+        SELECT * FROM read_files('/FileStore/hwe-data/stores/stores.csv', format => 'csv')
+    """)
+    assert reads == set()
+    assert writes == {"stores_raw"}
+
+
+def test_table_references_ignores_from_inside_functions():
+    reads, _ = table_references("""
+        SELECT EXTRACT(YEAR FROM o.order_timestamp) AS year,
+               TRIM(BOTH ' ' FROM o.customer_name) AS name
+        FROM bronze.online_orders o
+        JOIN (SELECT isbn FROM silver.books) b ON b.isbn = o.isbn
+    """)
+    assert reads == {"bronze.online_orders", "silver.books"}
+
+
+def test_build_graph_independent_steps():
+    graph = build_graph(_SILVER_STEPS)
+    assert graph["silver_stores_merge"] == set()
+    assert graph["silver_categories_merge"] == set()
+    assert graph["silver_orders_merge"] == {"silver_orders_unified_view"}
+    assert graph["gold_dim_store_merge"] == {"silver_stores_merge"}
+    # Two writers of the same table keep their notebook order
+    assert graph["gold_dim_store_sentinel"] == {"gold_dim_store_merge"}
+
+
+def test_critical_path_is_longest_chain():
+    graph = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    path, seconds = critical_path(graph, {"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0})
+    assert path == ["a", "b", "d"]
+    assert seconds == 7.0
+
+
+# ---------------------------------------------------------------------------
+# Tests — concurrent execution
+# ---------------------------------------------------------------------------
+
+def test_run_pipeline_runs_independent_steps_concurrently(spark):
+    steps = [
+        _step("left", "CREATE OR REPLACE TEMPORARY VIEW left_v AS SELECT 1 AS id"),
+        _step("right", "CREATE OR REPLACE TEMPORARY VIEW right_v AS SELECT 1 AS id"),
+        _step("joined", "CREATE OR REPLACE TEMPORARY VIEW joined_v AS "
+                        "SELECT l.id FROM left_v l JOIN right_v r ON l.id = r.id"),
+    ]
+    barrier = threading.Barrier(2, timeout=30)
+
+    def execute(session, step):
+        if step.name in ("left", "right"):
+            barrier.wait()  # deadlocks (and times out) unless both run at once
+        session.sql(step.sql)
+
+    report = run_pipeline(spark, steps, max_workers=2, execute=execute)
+    assert spark.sql("SELECT * FROM joined_v").count() == 1
+    assert report.critical_path[-1] == "joined"
+    assert [t.name for t in report.timings][-1] == "joined"
+
+
+def test_run_pipeline_uses_fair_pool_per_layer(spark):
+    pools = {}
+
+    def execute(session, step):
+        pools[step.name] = session.sparkContext.getLocalProperty("spark.scheduler.pool")
+
+    run_pipeline(spark, _SILVER_STEPS, execute=execute)
+    assert pools["silver_stores_merge"] == "silver"
+    assert pools["gold_dim_store_merge"] == "gold"
+    assert pools["silver_orders_unified_view"] == "default"
+
+
+def test_run_pipeline_stops_after_failure(spark):
+    ran = []
+
+    def execute(session, step):
+        if step.name == "silver_stores_merge":
+            time.sleep(0.1)
+            raise ValueError("boom")
+        ran.append(step.name)
+
+    with pytest.raises(RuntimeError, match="silver_stores_merge"):
+        run_pipeline(spark, _SILVER_STEPS, max_workers=1, execute=execute)
+    # Independent steps were ready too, but none was queued behind the failure
+    assert ran == []
@@ -0,0 +1,143 @@
+"""Tests for the physical plan regression guard."""
+
+import json
+
+import pytest
+
+from tests.medallion_data import BRONZE_DATA, GOLD_DIMS, SILVER_DATA, create_bronze_source_views
+from tests.plan_snapshots import (
+    check_snapshots,
+    compare_plans,
+    normalize_plan,
+    plan_operators,
+    plan_query,
+)
+
+_PLAN = """*(3) Project [order_id#12, isbn#40]
++- *(3) BroadcastHashJoin [isbn#40], [isbn#77], Inner, BuildRight, false
+   :- *(3) Filter isnotnull(isbn#40)
+   :  +- *(3) ColumnarToRow
+   :     +- FileScan parquet spark_catalog.silver.order_items[order_id#12,isbn#40] Batched: true, DataFilters: [isnotnull(isbn#40)], Format: Parquet, Location: PreparedDeltaFileIndex(1 paths)[file:/tmp/warehouse/silver.db/order_items], PartitionFilters: [], PushedFilters: [IsNotNull(isbn)], ReadSchema: struct<order_id:string,isbn:string>
+   +- BroadcastExchange HashedRelationBroadcastMode(List(input[0, string, false]),false), [plan_id=101]
+      +- *(2) Filter isnotnull(isbn#77)
+         +- FileScan parquet spark_catalog.silver.books[isbn#77] Batched: true, DataFilters: [isnotnull(isbn#77)], Format: Parquet, Location: PreparedDeltaFileIndex(1 paths)[file:/tmp/warehouse/silver.db/books], PartitionFilters: [], PushedFilters: [IsNotNull(isbn)], ReadSchema: struct<isbn:string>
+"""
+
+
+# ---------------------------------------------------------------------------
+# Tests — normalization and comparison
+# ---------------------------------------------------------------------------
+
+def test_normalize_plan_removes_ids_and_paths():
+    plan = normalize_plan(_PLAN)
+    assert "#12" not in plan and "plan_id" not in plan and "/tmp/warehouse" not in plan
+    assert "*(3)" not in plan
+    assert normalize_plan(_PLAN.replace("#12", "#999")) == plan
+
+
+def test_plan_operators_counts_nodes():
+    ops = plan_operators(normalize_plan(_PLAN))
+    assert ops["BroadcastHashJoin"] == 1
+    assert ops["FileScan"] == 2
+    assert ops["BroadcastExchange"] == 1
+
+
+def test_compare_plans_flags_lost_broadcast_and_new_shuffle():
+    golden = normalize_plan(_PLAN)
+    current = golden.replace("BroadcastHashJoin", "SortMergeJoin").replace(
+        "BroadcastExchange", "Exchange"
+    )
+    issues = compare_plans(golden, current)
+    assert "BroadcastHashJoin nodes 1 -> 0" in issues
+    assert "SortMergeJoin nodes 0 -> 1" in issues
+    assert "Exchange nodes 0 -> 1" in issues
+
+
+def test_compare_plans_flags_lost_pushdown():
+    golden = normalize_plan(_PLAN)
+    current = golden.replace("PushedFilters: [IsNotNull(isbn)]", "PushedFilters: []", 1)
+    assert compare_plans(golden, current) == ["scans with pushed filters 2 -> 1"]
+
+
+def test_compare_plans_flags_cartesian_without_golden():
+    assert compare_plans(None, "CartesianProduct\n:- Scan\n+- Scan\n") == [
+        "CartesianProduct present (1x)"
+    ]
+
+
+def test_plan_query_for_merge_is_source_lookup():
+    query, defines_view = plan_query("""
+        MERGE INTO silver.order_items AS t
+        USING order_items_exploded AS s
+        ON t.order_id = s.order_id AND t.isbn = s.isbn
+        WHEN MATCHED THEN UPDATE SET *
+        WHEN NOT MATCHED THEN INSERT *
+    """)
+    assert not defines_view
+    assert query == (
+        "SELECT * FROM order_items_exploded s LEFT JOIN silver.order_items t "
+        "ON t.order_id = s.order_id AND t.isbn = s.isbn"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tests — snapshots
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def bronze_source_views(spark):
+    create_bronze_source_views(spark)
+
+
+def test_missing_golden_fails_until_updated(spark, tmp_path):
+    notebook = _notebook(tmp_path / "lab.ipynb", [
+        "-- @test:books_view\nCREATE OR REPLACE TEMPORARY VIEW books_v AS SELECT * FROM bronze.books",
+    ])
+    snapshots = tmp_path / "snapshots"
+    assert check_snapshots(spark, [notebook], str(snapshots), update=False)["books_view"]
+    assert not snapshots.exists()
+
+    assert check_snapshots(spark, [notebook], str(snapshots), update=True) == {"books_view": []}
+    assert check_snapshots(spark, [notebook], str(snapshots), update=False) == {"books_view": []}
+
+
+def test_snapshots_written_then_compared(spark, tmp_path):
+    notebook = _notebook(tmp_path / "lab.ipynb", [
+        "-- @test:books_view\nCREATE OR REPLACE TEMPORARY VIEW books_v AS SELECT * FROM bronze.books",
+        "-- @test:books_merge\nMERGE INTO silver.books t USING books_v s ON t.isbn = s.isbn\n"
+        "WHEN NOT MATCHED THEN INSERT (isbn, title, author, category_id) "
+        "VALUES (s.isbn, s.title, s.author, s.category_id)",
+    ])
+    snapshots = tmp_path / "snapshots"
+    first = check_snapshots(spark, [notebook], str(snapshots), update=True)
+    assert first == {"books_view": [], "books_merge": []}
+    assert (snapshots / "books_merge.txt").exists()
+
+    # A cartesian product sneaking into the lookup is flagged
+    broken = _notebook(tmp_path / "broken.ipynb", [
+        "-- @test:books_view\nCREATE OR REPLACE TEMPORARY VIEW books_v AS SELECT * FROM bronze.books",
+        "-- @test:books_merge\nMERGE INTO silver.books t USING books_v s ON true\n"
+        "WHEN NOT MATCHED THEN INSERT (isbn, title, author, category_id) "
+        "VALUES (s.isbn, s.title, s.author, s.category_id)",
+    ])
+    second = check_snapshots(spark, [broken], str(snapshots), update=False)
+    assert second["books_merge"]
+
+
+def test_medallion_plans_match_snapshots(spark, layer_snapshots):
+    # Plan against populated tables, not the empty ones the DDL creates
+    layer_snapshots.restore("plan_layers", {**BRONZE_DATA, **SILVER_DATA, **GOLD_DIMS})
+    results = check_snapshots(spark)
+    if not results:
+        pytest.skip("no tagged medallion cell has a query to plan yet")
+    regressions = {tag: issues for tag, issues in results.items() if issues}
+    assert not regressions, f"Plan regressions: {regressions}"
+
+
+def _notebook(path, sources):
+    cells = [
+        {"cell_type": "code", "execution_count": None, "metadata": {}, "outputs": [], "source": s}
+        for s in sources
+    ]
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4}))
+    return str(path)
@@ -0,0 +1,125 @@
+"""Tests for the declarative bronze → silver data-quality rules."""
+
+import pytest
+
+from tests.quality_rules import (
+    QUARANTINE_TABLE,
+    VIOLATIONS_TABLE,
+    check_table,
+    flag_sql,
+)
+
+
+# ---------------------------------------------------------------------------
+# Tests — per-rule violation counts
+# ---------------------------------------------------------------------------
+
+def test_books_rules_counted_per_rule(spark):
+    result = check_table(spark, "bronze.books")
+    assert result.rows_checked == 5
+    assert result.violations == {
+        "isbn_not_empty": 0,
+        "title_not_empty": 2,
+        "isbn_13_format": 1,
+    }
+    assert result.quarantined == 3
+
+
+def test_violations_table_has_one_row_per_rule(spark):
+    check_table(spark, "bronze.books")
+    rows = spark.sql(f"""
+        SELECT rule_name, violations FROM {VIOLATIONS_TABLE}
+        WHERE table_name = 'bronze.books'
+    """).collect()
+    assert {r.rule_name: r.violations for r in rows}["title_not_empty"] == 2
+    assert len(rows) == 3
+
+
+def test_quarantine_keeps_rejected_rows(spark):
+    check_table(spark, "bronze.books")
+    rows = spark.sql(f"""
+        SELECT failed_rules, get_json_object(record, '$.isbn') AS isbn
+        FROM {QUARANTINE_TABLE}
+    """).collect()
+    by_isbn = {r.isbn: r.failed_rules for r in rows}
+    assert by_isbn["BADISBN"] == ["isbn_13_format"]
+    assert by_isbn["978-0-00-000004-4"] == ["title_not_empty"]
+    assert len(rows) == 3
+
+
+def test_clean_view_excludes_rejected_rows(spark):
+    check_table(spark, "bronze.books", clean_view="books_clean")
+    isbns = {r.isbn for r in spark.sql("SELECT isbn FROM books_clean").collect()}
+    assert isbns == {"978-0-00-000001-1", "978-0-00-000002-2"}
+
+
+# ---------------------------------------------------------------------------
+# Tests — referential integrity and cross-checks
+# ---------------------------------------------------------------------------
+
+def test_orders_referential_integrity_allows_sentinels(spark):
+    result = check_table(spark, "silver.orders")
+    assert result.violations["customer_email_in_customers"] == 1  # carol@example.com
+    assert result.violations["store_nbr_in_stores"] == 0
+
+
+def test_orders_total_amount_cross_check(spark):
+    result = check_table(spark, "silver.orders")
+    assert result.violations["total_amount_matches_items"] == 1  # ONL-002
+
+
+def test_order_items_composite_reference(spark):
+    result = check_table(spark, "silver.order_items")
+    assert result.violations["order_id_order_channel_in_orders"] == 1  # ONL-999
+    assert result.violations["isbn_in_books"] == 1
+
+
+def test_flag_sql_is_single_query():
+    sql = flag_sql("silver.orders")
+    assert sql.count("FROM silver.orders src") == 1
+    assert sql.count("LEFT JOIN") == 3
+
+
+# ===========================================================================
+# Fixtures
+# ===========================================================================
+
+@pytest.fixture(autouse=True)
+def dq_data(spark):
+    """Populate bronze.books and the silver tables with known violations."""
+    spark.sql("""
+        INSERT INTO bronze.books VALUES
+        ('978-0-00-000001-1', 'Test Book One',  'Author A', '11', current_timestamp(), 'books.csv'),
+        ('978-0-00-000002-2', 'Test Book Two',  'Author B', '11', current_timestamp(), 'books.csv'),
+        ('BADISBN',           'Bad ISBN Book',   'Author C', '11', current_timestamp(), 'books.csv'),
+        ('978-0-00-000004-4', '',                'Author D', '11', current_timestamp(), 'books.csv'),
+        ('978-0-00-000005-5', '   ',             'Author E', '11', current_timestamp(), 'books.csv')
+    """)
+    spark.sql("""
+        INSERT INTO silver.stores VALUES
+        ('S001', 'Downtown Books', '100 Main St', 'Springfield', 'IL', '62701')
+    """)
+    spark.sql("""
+        INSERT INTO silver.books VALUES
+        ('978-0-00-000001-1', 'Test Book One', 'Author A', '11')
+    """)
+    spark.sql("""
+        INSERT INTO silver.customers VALUES
+        ('alice@example.com', 'Alice Smith', '123 Elm St', 'Springfield', 'IL', '62701')
+    """)
+    spark.sql("""
+        INSERT INTO silver.orders VALUES
+        ('ONL-001', 'online',   CAST('2025-06-15 10:00:00' AS TIMESTAMP),
+         'alice@example.com', 'online', 'credit_card', CAST(39.98 AS DECIMAL(10,2)), NULL),
+        ('ONL-002', 'online',   CAST('2025-06-15 14:00:00' AS TIMESTAMP),
+         'carol@example.com', 'online', 'debit_card', CAST(99.99 AS DECIMAL(10,2)), NULL),
+        ('INS-001', 'in-store', CAST('2025-06-15 11:00:00' AS TIMESTAMP),
+         'in-store', 'S001', 'cash', CAST(19.99 AS DECIMAL(10,2)), 'Bob Jones')
+    """)
+    spark.sql("""
+        INSERT INTO silver.order_items VALUES
+        ('ONL-001', 'online',   '978-0-00-000001-1', 2, CAST(19.99 AS DECIMAL(10,2))),
+        ('ONL-002', 'online',   '978-0-00-000001-1', 1, CAST(19.99 AS DECIMAL(10,2))),
+        ('INS-001', 'in-store', '978-0-00-000001-1', 1, CAST(19.99 AS DECIMAL(10,2))),
+        ('ONL-999', 'online',   '978-0-00-000002-2', 1, CAST(24.99 AS DECIMAL(10,2)))
+    """)
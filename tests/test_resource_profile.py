@@ -0,0 +1,66 @@
+"""Tests for memory-bounded resource profiles."""
+
+import pytest
+
+from tests.resource_profile import (
+    MB,
+    memory_report,
+    parse_size,
+    plan_profile,
+    spark_conf,
+)
+from tests.spark_metrics import cell_metrics
+
+_GB = 1024 * MB
+
+
+@pytest.mark.parametrize("size, expected", [
+    (1024, 1024),
+    ("512m", 512 * MB),
+    ("20g", 20 * _GB),
+    ("1.5G", int(1.5 * _GB)),
+])
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_small_data_keeps_few_partitions():
+    profile = plan_profile(10 * MB, cores=8, memory_bytes=32 * _GB)
+    assert profile.shuffle_partitions == 16
+
+
+def test_large_data_scales_partitions_to_cores():
+    profile = plan_profile(20 * _GB, cores=8, memory_bytes=32 * _GB)
+    assert profile.shuffle_partitions % 8 == 0
+    assert profile.shuffle_partitions * profile.partition_bytes >= 20 * _GB * 3
+
+
+def test_partitions_fit_in_a_core_share_of_memory():
+    profile = plan_profile(20 * _GB, cores=16, memory_bytes=4 * _GB)
+    assert profile.partition_bytes < 128 * MB
+    assert profile.heap_bytes + profile.offheap_bytes <= 4 * _GB
+
+
+def test_spark_conf_enables_aqe_and_offheap():
+    conf = spark_conf(plan_profile(20 * _GB, cores=8, memory_bytes=32 * _GB))
+    assert conf["spark.sql.adaptive.coalescePartitions.enabled"] == "true"
+    assert conf["spark.memory.offHeap.enabled"] == "true"
+    assert conf["spark.driver.memory"].endswith("m")
+
+
+def test_memory_report_lists_stages(spark):
+    with cell_metrics(spark, "explode", budget={"max_disk_spill_bytes": 1e12}) as metrics:
+        spark.sql("""
+            SELECT id % 10 AS k, count(*) AS n
+            FROM (SELECT explode(sequence(1, 1000)) AS id)
+            GROUP BY id % 10
+        """).collect()
+    assert metrics.totals()["peak_execution_memory"] >= 0
+    report = memory_report(spark, metrics)
+    assert "peak exec MB" in report.splitlines()[0]
+    assert len(report.splitlines()) > 1
@@ -0,0 +1,87 @@
+"""Tests for the per-cell Spark metrics instrumentation."""
+
+import json
+
+import pytest
+
+from tests.spark_metrics import CellMetrics, cell_metrics, check_budget, run_instrumented
+
+_MERGE = """
+    MERGE INTO bronze.stores t
+    USING stores_raw s
+    ON t.store_nbr = s.store_nbr
+    WHEN MATCHED THEN UPDATE SET *
+    WHEN NOT MATCHED THEN INSERT *
+"""
+
+
+def test_disabled_without_path_or_budget(spark, monkeypatch):
+    monkeypatch.delenv("CELL_METRICS_PATH", raising=False)
+    monkeypatch.delenv("CELL_METRICS_BUDGET", raising=False)
+    _, metrics = run_instrumented(spark, "bronze_stores_merge", _MERGE)
+    assert metrics is None
+
+
+def test_collects_jobs_stages_and_delta_commit(spark, tmp_path, monkeypatch):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("CELL_METRICS_PATH", str(path))
+    _, metrics = run_instrumented(spark, "bronze_stores_merge", _MERGE)
+
+    totals = metrics.totals()
+    assert totals["jobs"] > 0
+    assert totals["stages"] > 0
+    assert totals["output_bytes"] > 0
+    assert metrics.plan
+    commit = metrics.delta_commits["bronze.stores"]
+    assert commit["operation"] == "MERGE"
+    assert commit["metrics"]["numTargetRowsInserted"] == "2"
+
+    line = json.loads(path.read_text().splitlines()[-1])
+    assert line["tag"] == "bronze_stores_merge"
+    assert line["jobs"] == totals["jobs"]
+
+
+def test_only_counts_jobs_inside_block(spark):
+    spark.sql("SELECT COUNT(*) FROM stores_raw").collect()
+    with cell_metrics(spark, "noop", budget={"max_jobs": 100}) as metrics:
+        pass
+    assert metrics.totals()["jobs"] == 0
+
+
+def test_restores_callers_job_group(spark):
+    sc = spark.sparkContext
+    sc.setJobGroup("caller", "outer job group", interruptOnCancel=True)
+    try:
+        with cell_metrics(spark, "noop", budget={"max_jobs": 100}):
+            assert sc.getLocalProperty("spark.job.interruptOnCancel") == "false"
+        assert sc.getLocalProperty("spark.jobGroup.id") == "caller"
+        assert sc.getLocalProperty("spark.job.description") == "outer job group"
+        assert sc.getLocalProperty("spark.job.interruptOnCancel") == "true"
+    finally:
+        for key in ("spark.jobGroup.id", "spark.job.description", "spark.job.interruptOnCancel"):
+            sc.setLocalProperty(key, None)
+
+
+def test_budget_exceeded_fails(spark):
+    with pytest.raises(AssertionError, match="output_bytes"):
+        run_instrumented(spark, "bronze_stores_merge", _MERGE,
+                         budget={"max_output_bytes": 0})
+
+
+def test_check_budget_rejects_unknown_metric():
+    with pytest.raises(KeyError):
+        check_budget(CellMetrics("x"), {"max_widgets": 1})
+
+
+@pytest.fixture(autouse=True)
+def stores_raw(spark):
+    spark.sql("""
+        CREATE OR REPLACE TEMPORARY VIEW stores_raw AS
+        SELECT 'S001' AS store_nbr, 'Downtown Books' AS name, '100 Main St' AS address,
+               'Springfield' AS city, 'IL' AS state, '62701' AS zip,
+               current_timestamp() AS ingestion_timestamp, 'stores.csv' AS source_filename
+        UNION ALL
+        SELECT 'S002', 'Airport Books', '200 Terminal Dr',
+               'Springfield', 'IL', '62702',
+               current_timestamp(), 'stores.csv'
+    """)
@@ -0,0 +1,81 @@
+"""Tests for notebook SQL cell preprocessing and parse validation."""
+
+import json
+
+import pytest
+
+from tests.sql_cells import (
+    _PARSE_CACHE,
+    cell_hash,
+    check_tagged_cells,
+    parse_error,
+    prepare_ddl,
+    rewrite_ddl,
+)
+
+
+# ---------------------------------------------------------------------------
+# Tests — rewriting
+# ---------------------------------------------------------------------------
+
+def test_rewrite_ddl_adds_using_delta_and_strips_identity():
+    sql = "CREATE TABLE gold.dim_store (\n  store_id BIGINT GENERATED ALWAYS AS IDENTITY,\n  name STRING\n)\n"
+    assert rewrite_ddl(sql, needs_strip=True) == (
+        "CREATE TABLE gold.dim_store (\n  store_id BIGINT,\n  name STRING\n) USING DELTA"
+    )
+    assert "USING DELTA" not in rewrite_ddl("CREATE TABLE t (a INT) USING PARQUET")
+
+
+@pytest.mark.parametrize("sql", [
+    "",
+    "-- TODO: Create the bronze.stores table\n",
+    "CREATE SCHEMA IF NOT EXISTS bronze",
+    "-- TODO: Replace with your assigned catalog name\nUSE CATALOG your_catalog_name;\n",
+])
+def test_rewrite_ddl_skips_non_table_cells(sql):
+    assert rewrite_ddl(sql) is None
+
+
+def test_cell_hash_depends_on_rewrite_options():
+    assert cell_hash("CREATE TABLE t (a INT)", True) != cell_hash("CREATE TABLE t (a INT)", False)
+
+
+# ---------------------------------------------------------------------------
+# Tests — parsing
+# ---------------------------------------------------------------------------
+
+def test_parse_error_reports_position_and_is_cached(spark_session):
+    sql = "SELEC 1 FROM bronze.stores"
+    error = parse_error(spark_session, sql)
+    assert error and "SQL ==" not in error
+    assert _PARSE_CACHE[cell_hash(sql)] == error
+    assert parse_error(spark_session, "MERGE INTO silver.books t USING b s ON t.isbn = s.isbn "
+                                      "WHEN MATCHED THEN UPDATE SET *") is None
+
+
+def test_prepare_ddl_reports_every_broken_cell(spark_session, tmp_path):
+    notebook = _notebook(tmp_path / "create.ipynb", [
+        "CREATE TABLE bronze.a (id INT",
+        "CREATE TABLE bronze.b (id INT)",
+        "CREATE TABEL bronze.c (id INT)",
+    ])
+    with pytest.raises(ValueError) as excinfo:
+        prepare_ddl(spark_session, [(notebook, False)])
+    message = str(excinfo.value)
+    assert "2 notebook SQL cell(s)" in message
+    assert "[cell 0]" in message and "[cell 2]" in message and "[cell 1]" not in message
+
+
+def test_medallion_cells_parse(spark_session):
+    prepare_ddl(spark_session)
+    diagnostics = check_tagged_cells(spark_session)
+    assert not diagnostics, "\n".join(f"{d.cell}: {d.error}" for d in diagnostics)
+
+
+def _notebook(path, sources):
+    cells = [
+        {"cell_type": "code", "execution_count": None, "metadata": {}, "outputs": [], "source": s}
+        for s in sources
+    ]
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4}))
+    return str(path)
@@ -0,0 +1,126 @@
+"""Tests for the surrogate key allocator."""
+
+from decimal import Decimal
+
+import pytest
+
+from tests.fixture_data import load_tables
+from tests.surrogate_keys import (
+    KEY_MAP_TABLE,
+    apply_keys,
+    assign_keys,
+    key_lookup,
+    seed_from_dimension,
+)
+
+
+@pytest.fixture(autouse=True)
+def silver_customers(spark):
+    load_tables(spark, {
+        "silver.customers": [
+            ("carol@example.com", "Carol White", "789 Pine Rd", "Springfield", "IL", "62703"),
+            ("alice@example.com", "Alice Smith", "123 Elm St",  "Springfield", "IL", "62701"),
+            ("bob@example.com",   "Bob Jones",   "456 Oak Ave", "Springfield", "IL", "62702"),
+        ],
+    })
+
+
+def _keys(spark, dimension):
+    rows = spark.sql(
+        f"SELECT natural_key, surrogate_key FROM {KEY_MAP_TABLE} WHERE dimension = '{dimension}'"
+    ).collect()
+    return {r.natural_key: r.surrogate_key for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Tests — sequence keys
+# ---------------------------------------------------------------------------
+
+def test_sequence_keys_follow_natural_key_order(spark):
+    assert assign_keys(spark, "customer") == 4
+    assert _keys(spark, "customer") == {
+        "alice@example.com": 1,
+        "bob@example.com": 2,
+        "carol@example.com": 3,
+        "in-store": 4,
+    }
+
+
+def test_existing_keys_never_change(spark):
+    assign_keys(spark, "customer")
+    spark.sql("INSERT INTO silver.customers (email) VALUES ('aaron@example.com')")
+    assert assign_keys(spark, "customer") == 1
+    keys = _keys(spark, "customer")
+    assert keys["alice@example.com"] == 1
+    assert keys["aaron@example.com"] == 5
+    assert assign_keys(spark, "customer") == 0
+
+
+def test_sequence_keys_dense_across_partitions(spark):
+    source = "SELECT lpad(CAST(id AS STRING), 6, '0') AS isbn FROM range(0, 5000, 1, 8)"
+    assert assign_keys(spark, "book", source=source) == 5000
+    keys = _keys(spark, "book")
+    assert sorted(keys.values()) == list(range(1, 5001))
+    assert keys["000000"] == 1 and keys["004999"] == 5000
+
+
+def test_seeded_keys_are_kept_and_continued(spark):
+    load_tables(spark, {
+        "gold.dim_customer": (["customer_id", "email"], [(10, "bob@example.com")]),
+    })
+    assert seed_from_dimension(spark, "customer") == 1
+    assign_keys(spark, "customer")
+    keys = _keys(spark, "customer")
+    assert keys["bob@example.com"] == 10
+    assert keys["alice@example.com"] == 11
+
+
+# ---------------------------------------------------------------------------
+# Tests — hash keys
+# ---------------------------------------------------------------------------
+
+def test_hash_keys_are_stable_and_positive(spark):
+    assign_keys(spark, "customer", method="hash")
+    keys = _keys(spark, "customer")
+    expected = spark.sql(
+        "SELECT xxhash64('alice@example.com') & 9223372036854775807 AS k"
+    ).first().k
+    assert keys["alice@example.com"] == expected
+    assert all(k >= 0 for k in keys.values())
+
+
+def test_unknown_method_rejected(spark):
+    with pytest.raises(ValueError, match="lottery"):
+        assign_keys(spark, "customer", method="lottery")
+
+
+# ---------------------------------------------------------------------------
+# Tests — using the key map
+# ---------------------------------------------------------------------------
+
+def test_apply_keys_fills_dimension(spark):
+    load_tables(spark, {
+        "gold.dim_customer": (["email", "name"], [
+            ("alice@example.com", "Alice Smith"),
+            ("in-store", "In-Store Customer"),
+        ]),
+    })
+    assign_keys(spark, "customer")
+    assert apply_keys(spark, "customer") == 2
+    rows = spark.sql("SELECT email, customer_id FROM gold.dim_customer").collect()
+    assert {r.email: r.customer_id for r in rows} == {"alice@example.com": 1, "in-store": 4}
+
+
+def test_fact_lookup_joins_key_map(spark):
+    assign_keys(spark, "customer")
+    load_tables(spark, {
+        "silver.orders": (["order_id", "order_channel", "customer_email", "total_amount"], [
+            ("ONL-001", "online", "bob@example.com", Decimal("39.98")),
+        ]),
+    })
+    row = spark.sql(f"""
+        SELECT c.customer_id
+        FROM silver.orders o
+        JOIN {key_lookup('customer')} c ON c.email = o.customer_email
+    """).first()
+    assert row.customer_id == 2
@@ -0,0 +1,89 @@
+"""Tests for the vectorized ISBN/email UDFs and their benchmark."""
+
+import pandas as pd
+import pytest
+
+from tests.quality_rules import check_table, normalized_email, not_empty, valid_isbn
+from tests.udf_benchmark import run_benchmark
+from tests.vectorized_udfs import (
+    isbn13_series,
+    isbn_is_valid_series,
+    normalize_email_series,
+)
+
+
+# ---------------------------------------------------------------------------
+# Tests — pandas functions
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("raw, expected", [
+    ("978-0-306-40615-7", "9780306406157"),   # hyphenated ISBN-13
+    ("9780306406157", "9780306406157"),       # hyphenless
+    (" 978 0 306 40615 7 ", "9780306406157"),  # spaces
+    ("0-306-40615-2", "9780306406157"),       # ISBN-10
+    ("080442957X", "9780804429573"),          # ISBN-10 with X check digit
+    ("978-0-306-40615-8", None),              # bad ISBN-13 checksum
+    ("0-306-40615-3", None),                  # bad ISBN-10 checksum
+    ("not an isbn", None),
+    ("\u0660\u0663\u0660\u0666\u0664\u0660\u0666\u0661\u0665\u0662", None),  # non-ASCII digits
+    ("", None),
+    (None, None),
+])
+def test_isbn13(raw, expected):
+    result = isbn13_series(pd.Series([raw]))[0]
+    assert (None if pd.isna(result) else result) == expected
+
+
+def test_isbn_is_valid_keeps_index():
+    values = pd.Series(["0-306-40615-2", "978-0-306-40615-8", None], index=[7, 8, 9])
+    assert isbn_is_valid_series(values).tolist() == [True, False, False]
+    assert list(isbn_is_valid_series(values).index) == [7, 8, 9]
+
+
+def test_normalize_email():
+    result = normalize_email_series(pd.Series([" Alice@Example.COM ", "   ", None]))
+    assert result[0] == "alice@example.com"
+    assert pd.isna(result[1]) and pd.isna(result[2])
+
+
+# ---------------------------------------------------------------------------
+# Tests — Spark
+# ---------------------------------------------------------------------------
+
+def test_udfs_registered_for_sql(spark):
+    row = spark.sql("""
+        SELECT isbn13('0-306-40615-2') AS isbn,
+               isbn_is_valid('978-0-306-40615-8') AS valid,
+               normalize_email(' Bob@Example.com') AS email
+    """).first()
+    assert row.isbn == "9780306406157"
+    assert row.valid is False
+    assert row.email == "bob@example.com"
+
+
+def test_checksum_rule_in_quality_checks(spark):
+    spark.sql("""
+        INSERT INTO silver.books (isbn, title, author, category_id) VALUES
+        ('978-0-306-40615-7', 'Good', 'A', '11'),
+        ('978-0-306-40615-8', 'Bad checksum', 'B', '11')
+    """)
+    result = check_table(spark, "silver.books", rules=[not_empty("title"), valid_isbn("isbn")])
+    assert result.violations == {"title_not_empty": 0, "isbn_checksum": 1}
+
+
+def test_email_rule_in_quality_checks(spark):
+    spark.sql("""
+        INSERT INTO silver.orders (order_id, order_channel, customer_email) VALUES
+        ('ONL-001', 'online', 'alice@example.com'),
+        ('ONL-002', 'online', ' Alice@Example.com'),
+        ('INS-001', 'in-store', 'in-store')
+    """)
+    result = check_table(spark, "silver.orders", rules=[normalized_email("customer_email")])
+    assert result.violations == {"customer_email_normalized": 1}
+
+
+def test_benchmark_small(spark):
+    results = {r.variant: r for r in run_benchmark(spark, rows=3000, partitions=2)}
+    assert set(results) == {"regex", "vectorized", "row_udf"}
+    assert results["vectorized"].matches == results["row_udf"].matches
+    assert 0 < results["vectorized"].matches < 3000
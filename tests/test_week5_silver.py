@@ -8,7 +8,9 @@ import pytest
 from pyspark.sql import Row
 from pyspark.sql import functions as F
 
+from tests.medallion_data import BRONZE_DATA
 from tests.notebook_utils import find_cell
+from tests.spark_metrics import run_instrumented
 
 _REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _W5_LAB = os.path.join(_REPO_ROOT, "labs", "week5", "week5_lab.ipynb")
@@ -129,7 +131,7 @@ def test_order_items_exploded(spark):
 def _run_cell(spark, pattern):
     sql = find_cell(_W5_LAB, pattern)
     assert sql is not None, f"Could not find cell matching: {pattern}"
-    spark.sql(sql)
+    run_instrumented(spark, pattern, sql)
 
 
 def _run_silver_stores(spark):
@@ -167,67 +169,12 @@ def _run_silver_order_items(spark):
 
 
 @pytest.fixture(autouse=True)
-def bronze_data(spark):
+def bronze_data(spark, layer_snapshots):
     """Automatically populate bronze tables for all silver tests.
 
-    This fixture runs before every test in this module, inserting test
-    data into all bronze tables that silver transformations read from.
+    This fixture runs before every test in this module. BRONZE_DATA (see
+    tests/medallion_data.py) is loaded into a snapshot once per session;
+    each test gets a shallow clone of it in the bronze tables that silver
+    transformations read from.
     """
-
-
-    # --- bronze.categories: 3-level hierarchy ---
-    spark.sql("""
-        INSERT INTO bronze.categories VALUES
-        ('1',  'Fiction',         '',  current_timestamp(), 'categories.csv'),
-        ('3',  'Science Fiction', '1', current_timestamp(), 'categories.csv'),
-        ('11', 'Space Opera',     '3', current_timestamp(), 'categories.csv')
-    """)
-
-    # --- bronze.stores ---
-    spark.sql("""
-        INSERT INTO bronze.stores VALUES
-        ('S001', 'Downtown Books', '100 Main St', 'Springfield', 'IL', '62701',
-         current_timestamp(), 'stores.csv')
-    """)
-
-    # --- bronze.books: 5 rows, only 2 should pass ISBN+title validation ---
-    spark.sql("""
-        INSERT INTO bronze.books VALUES
-        ('978-0-00-000001-1', 'Test Book One',  'Author A', '11', current_timestamp(), 'books.csv'),
-        ('978-0-00-000002-2', 'Test Book Two',  'Author B', '11', current_timestamp(), 'books.csv'),
-        ('BADISBN',           'Bad ISBN Book',   'Author C', '11', current_timestamp(), 'books.csv'),
-        ('978-0-00-000004-4', '',                'Author D', '11', current_timestamp(), 'books.csv'),
-        ('978-0-00-000005-5', '   ',             'Author E', '11', current_timestamp(), 'books.csv')
-    """)
-
-    # --- bronze.online_orders: 2 orders from same customer, different timestamps ---
-    spark.sql("""
-        INSERT INTO bronze.online_orders VALUES
-        ('ONL-001', CAST('2025-06-01 10:00:00' AS TIMESTAMP),
-         'alice@example.com', 'Alice Old', '100 Old St', 'OldCity', 'IL', '60001',
-         '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":2,"unit_price":19.99}]',
-         'credit_card', CAST(39.98 AS DECIMAL(10,2)),
-         current_timestamp(), 'online_orders_1.csv'),
-        ('ONL-002', CAST('2025-07-15 14:00:00' AS TIMESTAMP),
-         'alice@example.com', 'Alice New', '200 New Ave', 'NewCity', 'IL', '60002',
-         '[{"isbn":"978-0-00-000002-2","title":"Test Book Two","quantity":1,"unit_price":24.99}]',
-         'debit_card', CAST(24.99 AS DECIMAL(10,2)),
-         current_timestamp(), 'online_orders_2.csv')
-    """)
-
-    # --- bronze.instore_orders: 2 orders ---
-    # One with NULL email (should become 'in-store' sentinel)
-    # One with email
-    spark.sql("""
-        INSERT INTO bronze.instore_orders VALUES
-        ('INS-001', CAST('2025-06-15 11:00:00' AS TIMESTAMP),
-         'S001', NULL,
-         '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":1,"unit_price":19.99}]',
-         'cash', CAST(19.99 AS DECIMAL(10,2)), 'Bob Jones',
-         current_timestamp(), 'instore_orders_1.csv'),
-        ('INS-002', CAST('2025-06-16 12:00:00' AS TIMESTAMP),
-         'S001', 'bob@example.com',
-         '[{"isbn":"978-0-00-000001-1","title":"Test Book One","quantity":3,"unit_price":19.99},{"isbn":"978-0-00-000002-2","title":"Test Book Two","quantity":1,"unit_price":24.99}]',
-         'credit_card', CAST(84.96 AS DECIMAL(10,2)), 'Jane Doe',
-         current_timestamp(), 'instore_orders_2.csv')
-    """)
+    layer_snapshots.restore("bronze_loaded", BRONZE_DATA)
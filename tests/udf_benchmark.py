@@ -0,0 +1,94 @@
+"""Throughput benchmark: regex-only ISBN check vs the vectorized UDFs.
+
+Generates `rows` synthetic ISBNs with spark.range() (no input files) and
+times a single count_if() aggregation per variant:
+
+* regex      -- isbn RLIKE ISBN13_PATTERN, the current silver.books check
+* vectorized -- isbn_is_valid(isbn), the Arrow pandas UDF
+* row_udf    -- the same check as a row-at-a-time Python UDF, for reference
+                (skipped above `row_udf_max_rows`; it is far too slow)
+
+Run the full-size comparison from the repo root with:
+
+    python -m tests.udf_benchmark --rows 100000000
+
+test_vectorized_udfs runs it at a few thousand rows to keep it working.
+"""
+
+import argparse
+import time
+from collections import namedtuple
+
+from pyspark.sql.functions import udf
+
+from tests.quality_rules import ISBN13_PATTERN
+from tests.vectorized_udfs import isbn_is_valid_series, register_udfs
+
+BenchmarkResult = namedtuple("BenchmarkResult", ["variant", "rows", "matches", "seconds", "rows_per_second"])
+
+# Roughly one in ten generated ISBNs has a correct check digit; some are
+# written without hyphens.
+_GENERATED = """
+    SELECT CASE WHEN id % 3 = 0
+                THEN concat('978', lpad(CAST(id % 1000000000 AS STRING), 9, '0'), CAST(id % 10 AS STRING))
+                ELSE concat('978-', lpad(CAST(id % 1000000000 AS STRING), 9, '0'), CAST(id % 10 AS STRING))
+           END AS isbn
+    FROM range(0, {rows}, 1, {partitions})
+"""
+
+
+def run_benchmark(spark, rows=100_000_000, partitions=None, row_udf_max_rows=10_000_000):
+    """Return a BenchmarkResult per variant."""
+    register_udfs(spark)
+    spark.udf.register("isbn_is_valid_rows", udf(_row_is_valid, "boolean"))
+    partitions = partitions or spark.sparkContext.defaultParallelism
+    escaped = ISBN13_PATTERN.replace("\\", "\\\\")
+    variants = [
+        ("regex", f"isbn RLIKE '{escaped}'"),
+        ("vectorized", "isbn_is_valid(isbn)"),
+    ]
+    if rows <= row_udf_max_rows:
+        variants.append(("row_udf", "isbn_is_valid_rows(isbn)"))
+
+    source = _GENERATED.format(rows=rows, partitions=partitions)
+    results = []
+    for variant, condition in variants:
+        start = time.perf_counter()
+        matches = spark.sql(f"SELECT count_if({condition}) AS n FROM ({source})").first().n
+        seconds = time.perf_counter() - start
+        results.append(BenchmarkResult(variant, rows, matches, seconds, rows / seconds))
+    return results
+
+
+def format_results(results):
+    lines = [f"{'variant':<12} {'rows':>12} {'matches':>12} {'seconds':>9} {'rows/s':>14}"]
+    for r in results:
+        lines.append(
+            f"{r.variant:<12} {r.rows:>12,} {r.matches:>12,} {r.seconds:>9.2f} {r.rows_per_second:>14,.0f}"
+        )
+    return "\n".join(lines)
+
+
+def _row_is_valid(isbn):
+    import pandas as pd
+
+    return bool(isbn_is_valid_series(pd.Series([isbn]))[0])
+
+
+def main():
+    from pyspark.sql import SparkSession
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--partitions", type=int, default=None)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.master("local[*]").appName("udf-benchmark").getOrCreate()
+    try:
+        print(format_results(run_benchmark(spark, args.rows, args.partitions)))
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
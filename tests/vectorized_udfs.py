@@ -0,0 +1,105 @@
+"""Arrow-backed pandas UDFs for ISBN and email normalization.
+
+The silver.books check is a regex: it accepts any '978-' plus ten digits,
+including bad check digits, and rejects hyphenless or ISBN-10 values that
+are perfectly good books. These functions do the real work on whole
+Arrow batches at a time (numpy arithmetic over the digit matrix), rather
+than calling Python once per row:
+
+    isbn13(isbn)          -> 13 plain digits, ISBN-10s converted; NULL if invalid
+    isbn_is_valid(isbn)   -> TRUE when the ISBN-10 or ISBN-13 checksum holds
+    normalize_email(e)    -> trimmed, lower-cased; NULL if blank
+
+register_udfs() makes them callable from the notebook SQL under those
+names; the spark_session fixture registers them for every test. The plain
+pandas functions (isbn13_series, ...) are exposed for unit tests. Digits
+are matched as ASCII [0-9] only, so e.g. Arabic-Indic digits make an ISBN
+invalid rather than failing the whole batch. Return types are DataType
+objects, not DDL strings: PySpark parses a string type when the decorator
+runs, which needs a live SparkContext and would break importing this
+module before a session exists.
+"""
+
+import numpy as np
+import pandas as pd
+from pyspark.sql.functions import pandas_udf
+from pyspark.sql.types import BooleanType, StringType
+
+_SEPARATORS = r"[\s-]"
+
+
+def _digits(values, width):
+    """Return an int array of shape (len(values), width) for equal-length digit strings."""
+    if len(values) == 0:
+        return np.zeros((0, width), dtype=np.int64)
+    raw = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8)
+    return raw.reshape(-1, width).astype(np.int64) - ord("0")
+
+
+def _isbn13_check(first12):
+    weights = np.tile([1, 3], 6)
+    return (10 - (first12 * weights).sum(axis=1) % 10) % 10
+
+
+def isbn13_series(values):
+    """Normalize a pandas Series of ISBNs to 13 plain digits (None if invalid)."""
+    cleaned = values.astype("string").str.replace(_SEPARATORS, "", regex=True).str.upper()
+    result = pd.Series(pd.NA, index=values.index, dtype="string")
+
+    is13 = cleaned.str.fullmatch(r"97[89][0-9]{10}").fillna(False).astype(bool)
+    if is13.any():
+        candidates = cleaned[is13]
+        digits = _digits(candidates.tolist(), 13)
+        ok = _isbn13_check(digits[:, :12]) == digits[:, 12]
+        result[candidates.index[ok]] = candidates[ok]
+
+    is10 = cleaned.str.fullmatch(r"[0-9]{9}[0-9X]").fillna(False).astype(bool)
+    if is10.any():
+        candidates = cleaned[is10]
+        body = _digits(candidates.str.slice(0, 9).tolist(), 9)
+        check = candidates.str.slice(9).replace("X", "10").astype(int).to_numpy()
+        ok = (body * np.arange(10, 1, -1)).sum(axis=1) + check
+        ok = ok % 11 == 0
+        prefixed = np.hstack([np.tile([9, 7, 8], (len(body), 1)), body])
+        check13 = _isbn13_check(prefixed)
+        converted = "978" + candidates.str.slice(0, 9) + pd.Series(check13, index=candidates.index).astype(str)
+        result[candidates.index[ok]] = converted[ok]
+
+    return result
+
+
+def isbn_is_valid_series(values):
+    return isbn13_series(values).notna() & values.notna()
+
+
+def normalize_email_series(values):
+    emails = values.astype("string").str.strip().str.lower()
+    return emails.mask(emails == "")
+
+
+@pandas_udf(StringType())
+def isbn13(values: pd.Series) -> pd.Series:
+    return isbn13_series(values)
+
+
+@pandas_udf(BooleanType())
+def isbn_is_valid(values: pd.Series) -> pd.Series:
+    return isbn_is_valid_series(values)
+
+
+@pandas_udf(StringType())
+def normalize_email(values: pd.Series) -> pd.Series:
+    return normalize_email_series(values)
+
+
+UDFS = {
+    "isbn13": isbn13,
+    "isbn_is_valid": isbn_is_valid,
+    "normalize_email": normalize_email,
+}
+
+
+def register_udfs(spark):
+    """Register the UDFs as SQL functions on `spark`."""
+    for name, udf in UDFS.items():
+        spark.udf.register(name, udf)